@@ -1,9 +1,29 @@
-from ollama import ChatResponse
-from src.tools import scrape_yahoo_finance_news, speech_to_text
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
+from src.tools import iter_yahoo_finance_news, scrape_market_watch_news, scrape_yahoo_finance_news_batch, speech_to_text
+from src.tools.dedupe import SimHashIndex, collapse_near_duplicates
+from src.tools.news_aggregator import aggregate_stock_news
+from src.tools.context_manager import ConversationContext
+from src.tools.render import render_tool_output
+from src.tools.tool_cache import get_tool_cache, stop_requested
+from src.tools.ticker_matcher import cancel_unused, speculate_tickers
+from src.tools.model_warmup import DEFAULT_KEEP_ALIVE, awarm_up
+from src.tools.tracing import current_span, span
+from src.tools.prefetch import start_prefetch_from_env, warm_articles
 import asyncio
+import contextvars
+import functools
+import inspect
+import re
+import time
 import ollama
 #tools implementation
-def retrieve_stock_news(stock: str) -> list:
+def split_symbols(stocks: Union[str, List[str]]) -> List[str]:
+    """Split "NVDA, AMD" or "NVDA AMD" style input into separate symbols."""
+    items = [stocks] if isinstance(stocks, str) else stocks
+    return [symbol for item in items for symbol in re.split(r'[\s,;]+', str(item)) if symbol]
+
+def retrieve_stock_news(stock: str) -> Union[list, dict]:
     """
     Summarize news articles for a given stock symbol.
 
@@ -12,9 +32,33 @@ def retrieve_stock_news(stock: str) -> list:
 
     Returns:
         list: Summarized news articles with title,content,url and timestamp or an error message.
+        Several symbols in one string (e.g. "NVDA, AMD") are answered like retrieve_stocks_news.
     """
+    symbols = split_symbols(stock)
+    if len(symbols) != 1:
+        return retrieve_stocks_news(symbols)
+    stock = symbols[0]
     try:
-        articles = scrape_yahoo_finance_news(stock)
+        # Tickers kept warm by the prefetch daemon are answered from the local store
+        if (articles := warm_articles(stock)) is not None:
+            print(f"Serving {len(articles)} prefetched articles for {stock}")
+            return collapse_near_duplicates(articles)
+        # Near-duplicate stories (e.g. the same wire story under several URLs) reach the model once
+        index = SimHashIndex()
+        # Stream articles so progress is visible while slow pages load
+        articles = []
+        stream = iter_yahoo_finance_news(stock)
+        try:
+            for article in stream:
+                # A speculative run the model did not ask for stops here
+                if stop_requested():
+                    break
+                if index.add_if_new(article):
+                    articles.append(article)
+                    print(f"Retrieved article {len(articles)}: {article.title}")
+        finally:
+            # Closing the stream cancels article fetches that have not started yet
+            stream.close()
         return articles  # Return the list directly
 
     except Exception as e:
@@ -22,6 +66,71 @@ def retrieve_stock_news(stock: str) -> list:
         print(error_message)
         return error_message
 
+def retrieve_stocks_news(stocks: List[str]) -> Union[dict, str]:
+    """
+    Retrieve news articles for several stock symbols at once.
+
+    Args:
+        stocks (list[str]): The stock ticker symbols (e.g., ["NVDA", "AMD"]).
+
+    Returns:
+        dict: Each symbol mapped to its news articles, or an error message.
+    """
+    symbols = split_symbols(stocks)
+    if not symbols:
+        return "Error: no stock symbols given"
+    try:
+        # Articles shared between tickers are fetched once, but listed under every ticker;
+        # near-duplicates are collapsed within each ticker's list only
+        results = scrape_yahoo_finance_news_batch(symbols)
+        return {symbol: collapse_near_duplicates(articles) for symbol, articles in results.items()}
+
+    except Exception as e:
+        error_message = f"Error retrieving news for {', '.join(symbols)}: {str(e)}"
+        print(error_message)
+        return error_message
+
+def retrieve_market_watch_news(stock: str) -> list:
+    """
+    Retrieve MarketWatch news articles for a given stock symbol.
+
+    Args:
+        stock (str): The stock ticker symbol (e.g., "NVDA").
+
+    Returns:
+        list: News articles with title,content,url and timestamp or an error message.
+    """
+    try:
+        return collapse_near_duplicates(scrape_market_watch_news(stock))
+
+    except Exception as e:
+        error_message = f"Error retrieving MarketWatch news for {stock}: {str(e)}"
+        print(error_message)
+        return error_message
+
+def retrieve_all_news(stock: str) -> Union[dict, str]:
+    """
+    Retrieve news for a stock symbol from Yahoo Finance, MarketWatch and DuckDuckGo at once.
+
+    Args:
+        stock (str): The stock ticker symbol (e.g., "NVDA").
+
+    Returns:
+        dict: Articles from all sources ranked newest first, each tagged with its source,
+        and the sources that timed out, or an error message.
+    """
+    try:
+        news = aggregate_stock_news(stock)
+        return {
+            'articles': [article.model_dump() for article in news.articles],
+            'timed_out_sources': news.timed_out,
+        }
+
+    except Exception as e:
+        error_message = f"Error retrieving news for {stock}: {str(e)}"
+        print(error_message)
+        return error_message
+
 # define the system prompt and the agent's behavior
 system_prompt = """
 Image input capabilities: Closed
@@ -58,60 +167,223 @@ Output Structure:
 """
 
 
-messages = [{'role': 'system', 'content': system_prompt}]
+# Conversation history, trimmed to a prompt token budget before every request
+context = ConversationContext(system_prompt)
 
 # Define the available functions and their corresponding functions
 available_functions = {
     'retrieve_stock_news': retrieve_stock_news,
+    'retrieve_stocks_news': retrieve_stocks_news,
+    'retrieve_market_watch_news': retrieve_market_watch_news,
+    'retrieve_all_news': retrieve_all_news,
     'speech_to_text': speech_to_text,
 }
 
 
+# Sync tools run here so they never block the event loop; scraping is I/O bound, so threads suffice
+tool_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='tool')
+# Speculative scrapes started before the model has decided on tool use; kept apart so
+# unused ones never take workers from the model's real tool calls
+speculation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='speculate')
+
+# Seconds a tool may run before its result is replaced by a timeout message
+DEFAULT_TOOL_TIMEOUT = 60.0
+tool_timeouts = {
+    'retrieve_all_news': 10.0,
+    'speech_to_text': 600.0,
+}
+
+
+async def run_tool(name, function_to_call, arguments):
+    """Run one tool through the tool cache, off the event loop if it is synchronous, within its timeout."""
+    timeout = tool_timeouts.get(name, DEFAULT_TOOL_TIMEOUT)
+    # Identical calls share one execution and are answered from the tool cache while fresh
+    cache = get_tool_cache()
+    if inspect.iscoroutinefunction(function_to_call):
+        call = cache.acall(name, arguments, function_to_call)
+    else:
+        loop = asyncio.get_running_loop()
+        run_context = contextvars.copy_context()
+        call = loop.run_in_executor(
+            tool_executor,
+            functools.partial(run_context.run, cache.call, name, arguments, function_to_call),
+        )
+    try:
+        return await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        current_span().set(timed_out=True)
+        output = f"Error: {name} timed out after {timeout}s"
+        print(output)
+        return output
+
 async def call_function(tool_call):
     """Call the function specified in the tool call and return the output."""
-    if function_to_call := available_functions.get(tool_call.function.name):
-        print('Calling function:', tool_call.function.name)
+    name = tool_call.function.name
+    if function_to_call := available_functions.get(name):
+        print('Calling function:', name)
         print('Arguments:', tool_call.function.arguments)
-        output = function_to_call(**tool_call.function.arguments)
+        with span('tool', tool=name, arguments=tool_call.function.arguments):
+            output = await run_tool(name, function_to_call, tool_call.function.arguments)
         print('Function output:', output)
         return output
     else:
-        print('Function', tool_call.function.name, 'not found')
+        print('Function', name, 'not found')
         return None
 
+async def call_functions(tool_calls):
+    """Run all tool calls concurrently and return their outputs in call order."""
+    return await asyncio.gather(*(call_function(tool_call) for tool_call in tool_calls))
+
+def _tool_schema(name, description, parameters):
+    return {
+        'type': 'function',
+        'function': {
+            'name': name,
+            'description': description,
+            'parameters': {
+                'type': 'object',
+                'properties': parameters,
+                'required': list(parameters),
+            },
+        },
+    }
+
+stock_parameter = {'type': 'string', 'description': 'The stock ticker symbol (e.g., "NVDA").'}
+
+# Schemas are written out once so every request sends byte-identical tool definitions and
+# options; a stable prompt prefix lets Ollama reuse its cached prefill across turns
+tool_schemas = [ # add tools here
+    _tool_schema('retrieve_stock_news', 'Summarize news articles for a given stock symbol.',
+                 {'stock': stock_parameter}),
+    _tool_schema('retrieve_stocks_news', 'Retrieve news articles for several stock symbols at once.', {
+        'stocks': {
+            'type': 'array',
+            'items': {'type': 'string'},
+            'description': 'The stock ticker symbols (e.g., ["NVDA", "AMD"]).',
+        },
+    }),
+    _tool_schema('retrieve_market_watch_news', 'Retrieve MarketWatch news articles for a given stock symbol.',
+                 {'stock': stock_parameter}),
+    _tool_schema('retrieve_all_news',
+                 'Retrieve news for a stock symbol from Yahoo Finance, MarketWatch and DuckDuckGo at once.',
+                 {'stock': stock_parameter}),
+    _tool_schema('speech_to_text', 'Convert speech from a video URL to text.', {
+        'url': {'type': 'string', 'description': 'The URL of the video to transcribe.'},
+    }),
+]
+chat_options = {
+    'num_ctx': context.config.num_ctx
+}
+# Maximum number of tool rounds per user message before the model must answer
+MAX_TOOL_STEPS = 5
+
+
+async def stream_chat(client, model_name, context, tools=None):
+    """
+    Stream one completion to the terminal and return the assistant message.
+
+    Content is printed as it arrives; tool calls are collected from the stream.
+    Time to first token and generation speed are printed when the stream ends.
+    """
+    with span('llm.chat', model=model_name, tools=bool(tools)) as s:
+        start = time.perf_counter()
+        first_token = None
+        content = []
+        tool_calls = []
+        final = None
+        async for chunk in await client.chat(
+            model_name,
+            messages=context.prompt_messages(),
+            tools=tools,
+            options=chat_options,
+            keep_alive=DEFAULT_KEEP_ALIVE,
+            stream=True,
+        ):
+            if chunk.message.tool_calls:
+                tool_calls.extend(chunk.message.tool_calls)
+            if chunk.message.content:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                    print('Assistant: ', end='', flush=True)
+                print(chunk.message.content, end='', flush=True)
+                content.append(chunk.message.content)
+            if chunk.done:
+                final = chunk
+        end = time.perf_counter()
+        if first_token is not None:
+            print()
+
+        metrics = context.record_response(final)
+        # Prefer the server's own generation timing, fall back to wall clock
+        eval_count = getattr(final, 'eval_count', None)
+        eval_duration = getattr(final, 'eval_duration', None)
+        if eval_count and eval_duration:
+            tokens_per_second = eval_count / (eval_duration / 1e9)
+        else:
+            # Each streamed chunk carries about one token
+            tokens_per_second = len(content) / (end - first_token) if first_token and end > first_token else 0.0
+        ttft = f"{first_token - start:.2f}s" if first_token else "n/a"
+        # A model load shows up here only if the model was unloaded since the warm-up
+        load_seconds = (getattr(final, 'load_duration', None) or 0) / 1e9
+        load = f"load {load_seconds:.2f}s | " if load_seconds >= 0.1 else ""
+        print(f"[TTFT {ttft} | {load}prefill {metrics.prompt_eval_seconds or 0:.2f}s | {tokens_per_second:.1f} tokens/s | "
+              f"prompt {metrics.prompt_eval_count or metrics.estimated_prompt_tokens} tokens, "
+              f"{metrics.evicted_tokens} evicted | {len(tool_calls)} tool calls]")
+
+        s.set(ttft_ms=(first_token - start) * 1000 if first_token else None, prompt_tokens=metrics.prompt_eval_count,
+              eval_tokens=eval_count, tool_calls=len(tool_calls))
+        message = {'role': 'assistant', 'content': ''.join(content)}
+        if tool_calls:
+            message['tool_calls'] = tool_calls
+        return message
+
+
+async def run_turn(client, model_name, context, max_steps=MAX_TOOL_STEPS, speculations=None):
+    """
+    Answer the latest user message, running rounds of tool calls until the model replies.
+
+    All tool calls of one assistant message run concurrently and are answered
+    with a single follow-up completion. After max_steps tool rounds the model
+    is called without tools so it has to answer with what it has.
+
+    speculations are tool runs started before the first completion; the ones
+    the model does not ask for are cancelled once its first reply arrives.
+    """
+    for step in range(max_steps + 1):
+        message = await stream_chat(client, model_name, context, tool_schemas if step < max_steps else None)
+        context.append(message)
+        if step == 0 and speculations:
+            cancel_unused(speculations, message.get('tool_calls'))
+        if not message.get('tool_calls'):
+            return message['content']
+
+        outputs = await call_functions(message['tool_calls'])
+        for tool_call, output in zip(message['tool_calls'], outputs):
+            if output is None:
+                output = f"Error: tool {tool_call.function.name} not found"
+            context.append({'role': 'tool', 'content': render_tool_output(output), 'name': tool_call.function.name})
+
 async def main():
+    start_prefetch_from_env()
     client = ollama.AsyncClient()
     model_name = 'qwen3:latest'
+    # Load the model and prefill the system prompt and tools before the first question
+    try:
+        print(await awarm_up(client, model_name, context.messages[:1], tools=tool_schemas, options=chat_options))
+    except Exception as e:
+        print(f"Error warming up {model_name}: {e}")
     while True:
         user_input = input("You: ")
         if user_input.lower() in ['exit', 'quit']:
             print("Goodbye!")
             break
 
-        messages.append({'role': 'user', 'content': user_input})
-
-        response: ChatResponse = await client.chat(
-            model_name,
-            messages=messages,
-            tools=[retrieve_stock_news,speech_to_text], # add tools here
-            options={
-                'num_ctx': 131072
-            }
-        )
-
-        if response.message.tool_calls:
-            for tool_call in response.message.tool_calls:
-                output = await call_function(tool_call)
-                if output is not None:
-                    messages.append(response.message)
-                    messages.append({'role': 'tool', 'content': str(output), 'name': tool_call.function.name})
-
-                    final_response = await client.chat(model_name, messages=messages)
-                    print('Assistant:', final_response.message.content)
-                    messages.append({'role': 'assistant', 'content': final_response.message.content})
-        else:
-            print('Assistant:', response.message.content)
-            messages.append({'role': 'assistant', 'content': response.message.content})
+        context.append({'role': 'user', 'content': user_input})
+        with span('turn', model=model_name):
+            # Start scraping tickers named in the question while the model decides which tools to use
+            speculations = speculate_tickers(user_input, 'retrieve_stock_news', retrieve_stock_news, speculation_executor)
+            # The answer is printed while it streams
+            await run_turn(client, model_name, context, speculations=speculations)
 
 if __name__ == '__main__':
     try:
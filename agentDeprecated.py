@@ -1,5 +1,4 @@
 from ollama import chat
-from ollama import ChatResponse
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import matplotlib.dates as mdates
@@ -7,11 +6,15 @@ import os
 import json
 from dotenv import load_dotenv
 from src.tools import scrape_yahoo_finance_news
+from src.tools.summarize import SummarizeConfig, summarize_articles
 
 load_dotenv()
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
 
+# Articles are condensed by the small map model; the chat model writes the final summary
+summary_config = SummarizeConfig(reduce_model=os.getenv("STOCK_AGENT_REDUCE_MODEL", "qwen2.5"))
+
 # 2. Function
 def stock_news(stock,user_input):
     """
@@ -26,49 +29,8 @@ def stock_news(stock,user_input):
     """
     try:
         articles = scrape_yahoo_finance_news(stock)
-        system_prompt = f"""
-        Analyze and summarize the following news articles (max 10) for {stock}. Each article includes a title, content, URL, and timestamp. Here are the articles:
-
-        {articles}
-
-        Summary Guidelines:
-        1. Provide a concise overview of the key news from {stock}.
-        2. Highlight the most significant information from each article.
-        3. Include detailed information for each article, including:
-           - Title
-           - Key content points
-           - URL
-           - Timestamp
-        4. Organize the summary in a clear, easy-to-read format.
-        5. Focus on factual information and recent developments.
-        6. Clearly state that the news is sourced from Yahoo Finance and mention the total number of articles summarized (10).
-
-        Output Structure:
-        - **Overview**: A brief summary of all articles.
-        - **Detailed Summaries**: For each article, provide:
-          - Title
-          - Key content points
-          - URL
-          - Timestamp
-        """
-
-        # Use Ollama to generate a summary, we call the model and provide the summary prompt again as the user input
-        response: ChatResponse = chat(
-            'qwen2.5',  
-            messages=[
-                {
-                    'role': 'system', 
-                    'content': system_prompt
-                },
-                {'role': 'user', 'content': user_input},
-            ],
-            options={
-                'num_ctx': 8192  # Specify the context window size to allow longer inputs
-            }
-        )
-        
-        # Return the generated summary
-        return response['message']['content']
+        # Condense each article with a small model in parallel, then merge the digests in one call
+        return summarize_articles(stock, articles, user_input, summary_config)
 
     except Exception as e:
         error_message = f"Error retrieving or summarizing news for {stock}: {str(e)}"
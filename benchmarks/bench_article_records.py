@@ -0,0 +1,74 @@
+"""
+Compare construction and serialization cost of article representations.
+
+Run from the repository root:
+    python -m benchmarks.bench_article_records [--articles 10000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+
+from src.tools.models import ArticleBatch, ArticleDetails, ArticleRecord
+
+
+def make_rows(n):
+    return [
+        (f"Title {i}", "Paragraph of article content. " * 40, f"https://finance.yahoo.com/news/article-{i}.html",
+         "2025-05-01T12:00:00.000Z")
+        for i in range(n)
+    ]
+
+
+def best_of(repeat, fn):
+    """Return the fastest of several runs in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.articles)
+    models = [ArticleDetails(title=t, content=c, url=u, timestamp=ts) for t, c, u, ts in rows]
+    records = [ArticleRecord(t, c, u, ts) for t, c, u, ts in rows]
+    batch = ArticleBatch.from_models(models)
+
+    # Conversions must be lossless
+    assert [r.to_model() for r in records] == models
+    assert batch.to_models() == models
+    assert batch.to_dicts() == [m.model_dump() for m in models]
+
+    cases = [
+        ("construct ArticleDetails (validated)",
+         lambda: [ArticleDetails(title=t, content=c, url=u, timestamp=ts) for t, c, u, ts in rows]),
+        ("construct ArticleDetails.model_construct",
+         lambda: [ArticleDetails.model_construct(title=t, content=c, url=u, timestamp=ts) for t, c, u, ts in rows]),
+        ("construct ArticleRecord",
+         lambda: [ArticleRecord(t, c, u, ts) for t, c, u, ts in rows]),
+        ("construct ArticleBatch",
+         lambda: ArticleBatch(*map(list, zip(*rows)))),
+        ("serialize ArticleDetails.model_dump", lambda: [m.model_dump() for m in models]),
+        ("serialize ArticleRecord.to_dict", lambda: [r.to_dict() for r in records]),
+        ("serialize ArticleBatch.to_dicts", lambda: batch.to_dicts()),
+        ("json.dumps ArticleDetails.model_dump", lambda: json.dumps([m.model_dump() for m in models])),
+        ("json.dumps ArticleBatch.to_dicts", lambda: json.dumps(batch.to_dicts())),
+        ("to ArticleDetails from ArticleRecord", lambda: [r.to_model() for r in records]),
+        ("to ArticleDetails from ArticleBatch", lambda: batch.to_models()),
+    ]
+
+    print(f"{args.articles} articles, best of {args.repeat} runs")
+    print(f"{'case':45} {'total ms':>10} {'us/article':>11}")
+    for name, fn in cases:
+        ms = best_of(args.repeat, fn)
+        print(f"{name:45} {ms:10.2f} {ms * 1000 / args.articles:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
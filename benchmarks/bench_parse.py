@@ -0,0 +1,106 @@
+"""
+Offline parse-throughput benchmark over the fixture corpus in tests/fixtures.
+
+The committed pages are synthetic (see benchmarks.corpus), so the numbers compare
+parser backends and code changes rather than describe real-site pages.
+
+Reports pages/sec, p50/p99 latency and peak traced memory for
+YahooFinanceScraper.extract_article_details, YahooFinanceScraper.parse_listing
+and MarketWatchScraper.extract_article_details on every installed parser backend.
+HTTP is served from tests/fixtures, so no network access is needed.
+
+Run from the repository root:
+    python -m benchmarks.bench_parse [--iterations 20] [--backend lxml]
+"""
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+from unittest import mock
+
+from benchmarks.corpus import pages
+from src.tools.market_watch_sync import MarketWatchScraper
+from src.tools.html_parser import available_backends
+from src.tools.yahoo_finance_sync import ScraperConfig, YahooFinanceScraper
+
+
+def fixture_http_get(corpus):
+    """Build an http_get replacement that serves fixture pages by URL."""
+    by_url = {page['url']: page['html'] for page in corpus}
+
+    def http_get(url, **kwargs):
+        return SimpleNamespace(text=by_url[url], status_code=200, headers={})
+    return http_get
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def measure(name, corpus, call, iterations):
+    """Time call(page) over the corpus and return one result row."""
+    for page in corpus:
+        call(page)  # warm up imports and caches
+
+    latencies = []
+    for _ in range(iterations):
+        for page in corpus:
+            start = time.perf_counter()
+            call(page)
+            latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for page in corpus:
+        call(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'name': name,
+        'pages_per_sec': len(latencies) / sum(latencies),
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'peak_mb': peak / 1024 / 1024,
+    }
+
+
+def run(backends, iterations):
+    yahoo_articles = pages('yahoo', 'article')
+    yahoo_listings = pages('yahoo', 'listing')
+    mw_articles = pages('marketwatch', 'article')
+    scraper = YahooFinanceScraper(ScraperConfig(stock_symbol='NVDA', use_cache=False))
+    mw_scraper = MarketWatchScraper(ScraperConfig(stock_symbol='NVDA'))
+
+    rows = [measure('yahoo parse_listing', yahoo_listings, lambda p: scraper.parse_listing(p['html']), iterations)]
+    for backend in backends:
+        # Both scrapers fall back to the environment default backend
+        with mock.patch.dict(os.environ, {'STOCK_AGENT_HTML_PARSER': backend}), \
+                mock.patch('src.tools.yahoo_finance_sync.http_get', fixture_http_get(yahoo_articles)), \
+                mock.patch('src.tools.market_watch_sync.http_get', fixture_http_get(mw_articles)):
+            rows.append(measure(f'yahoo extract_article_details [{backend}]', yahoo_articles,
+                                lambda p: scraper.extract_article_details(p['url']), iterations))
+            rows.append(measure(f'marketwatch extract_article_details [{backend}]', mw_articles,
+                                lambda p: mw_scraper.extract_article_details(p['url']),
+                                iterations))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20, help='passes over the corpus per benchmark')
+    parser.add_argument('--backend', action='append', choices=available_backends(),
+                        help='parser backend to benchmark (repeatable); defaults to all installed')
+    args = parser.parse_args()
+
+    rows = run(args.backend or available_backends(), args.iterations)
+    print(f"{'benchmark':50} {'pages/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'peak MB':>8}")
+    for row in rows:
+        print(f"{row['name']:50} {row['pages_per_sec']:9.1f} {row['p50_ms']:8.2f} "
+              f"{row['p99_ms']:8.2f} {row['peak_mb']:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
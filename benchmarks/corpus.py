@@ -0,0 +1,47 @@
+"""
+Offline HTML fixture corpus of Yahoo Finance and MarketWatch pages.
+
+The committed pages are synthetic: generated to match the markup and selectors the
+scrapers expect, not captured from the live sites. Benchmark numbers over them measure
+the parsers, not real-site pages; run benchmarks.record_fixtures to replace them.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+MANIFEST_PATH = os.path.join(FIXTURE_DIR, 'manifest.json')
+
+
+def load_manifest() -> List[Dict]:
+    """Return manifest entries: file, source ('yahoo' or 'marketwatch'), kind ('listing' or 'article'), url."""
+    with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(entries: List[Dict]) -> None:
+    with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def read_page(entry: Dict) -> str:
+    with open(os.path.join(FIXTURE_DIR, entry['file']), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def pages(source: Optional[str] = None, kind: Optional[str] = None) -> List[Dict]:
+    """Return manifest entries with their HTML under 'html', filtered by source and kind."""
+    selected = []
+    for entry in load_manifest():
+        if (source is None or entry['source'] == source) and (kind is None or entry['kind'] == kind):
+            selected.append({**entry, 'html': read_page(entry)})
+    return selected
+
+
+def content_digest(content) -> str:
+    """Stable digest of parsed article content (a string or a list of paragraphs)."""
+    if isinstance(content, list):
+        content = '\n\n'.join(content)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
@@ -0,0 +1,87 @@
+"""
+Record live Yahoo Finance and MarketWatch pages into the offline fixture corpus.
+
+Run from the repository root (needs network access):
+    python -m benchmarks.record_fixtures NVDA AMD --articles 3
+
+Pages are named {source}_listing_{symbol}.html and {source}_article_{symbol}_{n}.html;
+pages from an earlier recording that are no longer listed are removed.
+
+Use --expected-only to recompute the expected parse results in the manifest
+from the pages already on disk, e.g. after an intentional parser change.
+"""
+import argparse
+import os
+
+from benchmarks.corpus import FIXTURE_DIR, content_digest, load_manifest, read_page, save_manifest
+from src.tools.market_watch_sync import MarketWatchScraper
+from src.tools.http_client import http_get
+from src.tools.yahoo_finance_sync import ScraperConfig, YahooFinanceScraper
+
+HEADERS = {"User-Agent": ScraperConfig.model_fields['user_agent'].default}
+
+
+def expected_results(entry, html):
+    """Parse a page with the html.parser backend and return what tests should expect."""
+    config = ScraperConfig(stock_symbol='NVDA', parser_backend='html.parser')
+    scraper = YahooFinanceScraper(config) if entry['source'] == 'yahoo' else MarketWatchScraper(config)
+    if entry['kind'] == 'listing':
+        return {'article_urls': scraper.parse_listing(html)}
+
+    article = scraper.parse_article(html, entry['url'])
+    return {
+        'title': article.title,
+        'timestamp': article.timestamp,
+        'content_sha256': content_digest(article.content),
+    }
+
+
+def record(path, url, source, kind):
+    response = http_get(url, headers=HEADERS)
+    response.raise_for_status()
+    with open(os.path.join(FIXTURE_DIR, path), 'w', encoding='utf-8') as f:
+        f.write(response.text)
+    print(f"Recorded {url} -> {path} ({len(response.content)} bytes)")
+    return {'file': path, 'source': source, 'kind': kind, 'url': url}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('symbols', nargs='*', default=['NVDA'])
+    parser.add_argument('--articles', type=int, default=3, help='articles to record per listing')
+    parser.add_argument('--expected-only', action='store_true', help='only recompute expected results')
+    args = parser.parse_args()
+
+    if args.expected_only:
+        entries = load_manifest()
+    else:
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        entries = []
+        for symbol in args.symbols:
+            yahoo = record(f"yahoo_listing_{symbol}.html", f"https://finance.yahoo.com/quote/{symbol}/news/",
+                           'yahoo', 'listing')
+            mw = record(f"marketwatch_listing_{symbol}.html",
+                        f"https://www.marketwatch.com/investing/stock/{symbol}?mod=search_symbol",
+                        'marketwatch', 'listing')
+            entries += [yahoo, mw]
+            for listing in (yahoo, mw):
+                urls = expected_results(listing, read_page(listing))['article_urls'][:args.articles]
+                for i, url in enumerate(urls, 1):
+                    entries.append(record(f"{listing['source']}_article_{symbol}_{i}.html", url,
+                                          listing['source'], 'article'))
+
+        # Drop pages of an earlier recording that the new manifest no longer lists
+        kept = {entry['file'] for entry in entries}
+        for name in os.listdir(FIXTURE_DIR):
+            if name.endswith('.html') and name not in kept:
+                os.remove(os.path.join(FIXTURE_DIR, name))
+                print(f"Removed stale fixture {name}")
+
+    for entry in entries:
+        entry['expected'] = expected_results(entry, read_page(entry))
+    save_manifest(entries)
+    print(f"Wrote {len(entries)} manifest entries")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@ from typing import List, Dict, Any, Optional, Union
 from ollama import chat
 from ollama import ChatResponse
 from src.tools import scrape_yahoo_finance_news
+from src.tools.summarize import summarize_articles
 
 # agent tools
 def stock_news(stock: str) -> str:
@@ -17,34 +18,8 @@ def stock_news(stock: str) -> str:
     print("task transferred to stock agent")
     try:
         articles: List[Dict[str, Any]] = scrape_yahoo_finance_news(stock)
-        summary_prompt: str = f"""
-        Analyze and summarize the following news articles (max 10) for {stock} with following, each articles includes title, content, url and timestamp, here is articles:
-        {articles}
-        Summary Guidelines:
-        1. Provide a concise overview of the key news for {stock}
-        2. Highlight the most significant information from each article, the article is inside of json content 
-        3. Include key insights of each articles, tell user that news source from yahoo finance and how many articles you summarized 
-        4. Organize the summary in a clear, easy-to-read format
-        5. Focus on factual information and recent developments
-        
-        """
-        # Use Ollama to generate a summary, we call the model and provide the summary prompt again as the user input
-        response: ChatResponse = chat(
-            'llama3.2',  
-            messages=[
-                {
-                    'role': 'system', 
-                    'content': f"You are a professional financial news summarizer. Provide a clear, informative summary of {stock} stock news."
-                },
-                {'role': 'user', 'content': summary_prompt},
-            ],
-            options={
-                'num_ctx': 8192  # Specify the context window size to allow longer inputs
-            }
-        )
-        
-        # Return the generated summary
-        return response['message']['content']
+        # Condense each article with a small model in parallel, then merge the digests in one call
+        return summarize_articles(stock, articles)
 
     except Exception as e:
         error_message: str = f"Error retrieving or summarizing news for {stock}: {str(e)}"
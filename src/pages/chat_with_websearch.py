@@ -1,10 +1,10 @@
 import streamlit as st
-import requests
 import re
 from ollama import chat
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from duckduckgo_search import DDGS
 from functools import lru_cache
+from tools.http_client import http_get
 
 # Cache search results to avoid repeating searches
 @lru_cache(maxsize=32)
@@ -31,7 +31,7 @@ def scrape_web(query):
     
     def fetch_content(result):
         try:
-            with requests.get(result['href'], timeout=3) as response:
+            with http_get(result['href'], timeout=3) as response:
                 response.raise_for_status()
                 return clean_html(response.text)[:5000]  # Limit content length
         except Exception as e:
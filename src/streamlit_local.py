@@ -1,9 +1,18 @@
 import streamlit as st
 import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import ollama
 from ollama import ChatResponse
-from tools import scrape_yahoo_finance_news
+from tools import iter_yahoo_finance_news
+from tools.dedupe import SimHashIndex, collapse_near_duplicates
+from tools.context_manager import ConversationContext
+from tools.render import render_tool_output
+from tools.tool_cache import get_tool_cache, stop_requested
+from tools.ticker_matcher import cancel_unused, speculate_tickers
+from tools.model_warmup import DEFAULT_KEEP_ALIVE, warm_up_once
+from tools.tracing import span
+from tools.prefetch import start_prefetch_from_env, warm_articles
 
 # Define the system prompt
 system_prompt = """
@@ -40,47 +49,109 @@ Output Structure:
 
 """
 
-# Keep this function exactly as provided
-def retrieve_stock_news(stock: str) -> list:
+def stock_news(stock: str, progress=None):
     """
-    Summarize news articles for a given stock symbol.
+    Retrieve news for a stock symbol without near-duplicate stories.
 
-    Args:
-        stock (str): The stock ticker symbol (e.g., "NVDA").
-
-    Returns:
-        list: Summarized news articles with title,content,url and timestamp or an error message.
+    Tickers kept warm by the prefetch daemon are answered from the local store,
+    others are scraped live. progress(text), if given, is called as articles arrive.
+    Speculative runs and the model's tool calls both use this function, so they
+    share one tool cache entry with the same result.
     """
+    index = SimHashIndex()
     try:
-        articles = scrape_yahoo_finance_news(stock)
-        return articles  # Return the list directly
-
+        if (warm := warm_articles(stock)) is not None:
+            if progress:
+                progress(f"_Retrieved {len(warm)} prefetched articles_")
+            return collapse_near_duplicates(warm, index)
+        articles = []
+        stream = iter_yahoo_finance_news(stock)
+        try:
+            for article in stream:
+                # A speculative run the model did not ask for stops here
+                if stop_requested():
+                    break
+                # Skip near-duplicate stories so they are not sent to the model twice
+                if not index.add_if_new(article):
+                    continue
+                articles.append(article)
+                if progress:
+                    progress(f"_Retrieved {len(articles)} articles: {article.title}_")
+        finally:
+            # Closing the stream cancels article fetches that have not started yet
+            stream.close()
+        return articles
     except Exception as e:
         error_message = f"Error retrieving or summarizing news for {stock}: {str(e)}"
-        print(error_message) 
+        print(error_message)
         return error_message
 
 # Define available functions
 available_functions = {
-    'stock_news': retrieve_stock_news,
+    'stock_news': stock_news,
 }
 
+# Tool schema and options are defined once so every request sends a byte-identical
+# prompt prefix, which lets Ollama reuse its cached prefill across turns
+stock_news_tool = {
+    "type": "function",
+    "function": {
+        "name": "stock_news",
+        "description": "Retrieve news articles for a given stock symbol",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "stock": {
+                    "type": "string",
+                    "description": "The stock ticker symbol (e.g., 'NVDA')"
+                }
+            },
+            "required": ["stock"]
+        }
+    }
+}
+
+# Speculative scrapes started before the model has decided on tool use
+speculation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='speculate')
+
 # Create a class for the chat assistant
 class StockChatAssistant:
     def __init__(self):
         self.client = ollama.Client()
         self.model_name = 'qwen3'
-        self.messages = [{'role': 'system', 'content': system_prompt}]
+        # History is trimmed to a prompt token budget before every request
+        self.context = ConversationContext(system_prompt)
+    
+    @property
+    def messages(self):
+        return self.context.messages
+    
+    def warm_up(self):
+        """Load the model and prefill the system prompt and tool schema once per process."""
+        return warm_up_once(
+            self.client, self.model_name, self.context.messages[:1],
+            tools=[stock_news_tool], options={'num_ctx': self.context.config.num_ctx},
+        )
     
     def clear_conversation(self):
-        self.messages = [{'role': 'system', 'content': system_prompt}]
+        self.context.clear()
     
-    async def call_function(self, tool_call):
+    async def call_function(self, tool_call, message_placeholder=None):
         """Call the function specified in the tool call and return the output."""
         if function_to_call := available_functions.get(tool_call.function.name):
             print('Calling function:', tool_call.function.name)
             print('Arguments:', tool_call.function.arguments)
-            output = function_to_call(**tool_call.function.arguments)
+            with span('tool', tool=tool_call.function.name, arguments=tool_call.function.arguments):
+                # Identical calls, also from other sessions, share one execution and a cached result
+                cache = get_tool_cache()
+                if tool_call.function.name == 'stock_news' and message_placeholder is not None:
+                    # Show each article as soon as it is parsed; placeholder updates run on the event loop
+                    loop = asyncio.get_running_loop()
+                    progress = lambda text: loop.call_soon_threadsafe(message_placeholder.markdown, text)
+                    function_to_call = lambda stock: stock_news(stock, progress)
+                output = await asyncio.to_thread(
+                    cache.call, tool_call.function.name, tool_call.function.arguments, function_to_call
+                )
             print('Function output:', output)
             return output
         else:
@@ -89,40 +160,32 @@ class StockChatAssistant:
     
     async def async_process_user_input_streaming(self, user_input, message_placeholder):
         """Process user input asynchronously with streaming response."""
-        self.messages.append({'role': 'user', 'content': user_input})
+        self.context.append({'role': 'user', 'content': user_input})
         
         # Create an AsyncClient for async operations
         async_client = ollama.AsyncClient()
         
-        # Define the stock_news_tool
-        stock_news_tool = {
-            "type": "function",
-            "function": {
-                "name": "stock_news",
-                "description": "Retrieve news articles for a given stock symbol",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "stock": {
-                            "type": "string",
-                            "description": "The stock ticker symbol (e.g., 'NVDA')"
-                        }
-                    },
-                    "required": ["stock"]
-                }
-            }
-        }
+        # Start scraping tickers named in the question while the model decides whether to use the tool
+        speculations = speculate_tickers(user_input, 'stock_news', stock_news, speculation_executor)
         
         # First check if tool is needed
-        stream = await async_client.chat(
-            self.model_name,
-            messages=self.messages,
-            tools=[stock_news_tool],
-            options={
-                'num_ctx': 131072   # Specify the context window size to allow longer inputs
-            },
-            stream=False  # Not streaming for the initial check
-        )
+        with span('llm.chat', model=self.model_name, stream=False) as s:
+            stream = await async_client.chat(
+                self.model_name,
+                messages=self.context.prompt_messages(),
+                tools=[stock_news_tool],
+                options={
+                    'num_ctx': self.context.config.num_ctx   # Prompt budget plus room for the reply
+                },
+                keep_alive=DEFAULT_KEEP_ALIVE,
+                stream=False  # Not streaming for the initial check
+            )
+            metrics = self.context.record_response(stream)
+            s.set(prompt_tokens=metrics.prompt_eval_count, eval_tokens=stream.eval_count,
+                  tool_calls=len(stream.message.tool_calls or []))
+        print(f"Prompt eval: {metrics.prompt_eval_count} tokens in {metrics.prompt_eval_seconds or 0:.2f}s, "
+              f"load {(stream.load_duration or 0) / 1e9:.2f}s")
+        cancel_unused(speculations, stream.message.tool_calls)
         
         if hasattr(stream.message, 'tool_calls') and stream.message.tool_calls:
             # Tool call detected, handle it first
@@ -130,51 +193,62 @@ class StockChatAssistant:
                 # Update placeholder to show tool usage
                 message_placeholder.markdown("_Using tool to retrieve stock information..._")
                 
-                output = await self.call_function(tool_call)
+                output = await self.call_function(tool_call, message_placeholder)
                 if output is not None:
-                    self.messages.append(stream.message)
-                    self.messages.append({'role': 'tool', 'content': str(output), 'name': tool_call.function.name})
+                    self.context.append(stream.message)
+                    self.context.append({'role': 'tool', 'content': render_tool_output(output), 'name': tool_call.function.name})
                     
                     # Now stream the final response after tool call
                     full_response = ""
                     message_placeholder.markdown("_Processing stock information..._")
                     
                     # Use streaming for the final response
-                    async for chunk in await async_client.chat(
-                        self.model_name,
-                        messages=self.messages,
-                        stream=True
-                    ):
-                        if hasattr(chunk, 'message') and chunk.message.content:
-                            full_response += chunk.message.content
-                            message_placeholder.markdown(full_response + "▌")
+                    with span('llm.chat', model=self.model_name, stream=True):
+                        async for chunk in await async_client.chat(
+                            self.model_name,
+                            messages=self.context.prompt_messages(),
+                            options={'num_ctx': self.context.config.num_ctx},
+                            keep_alive=DEFAULT_KEEP_ALIVE,
+                            stream=True
+                        ):
+                            if hasattr(chunk, 'message') and chunk.message.content:
+                                full_response += chunk.message.content
+                                message_placeholder.markdown(full_response + "▌")
+                            if getattr(chunk, 'done', False):
+                                self.context.record_response(chunk)
                     
                     # Update with final response
                     message_placeholder.markdown(full_response)
-                    self.messages.append({'role': 'assistant', 'content': full_response})
+                    self.context.append({'role': 'assistant', 'content': full_response})
                     return full_response
         else:
             # No tool call, stream directly
             full_response = ""
             
             # Start a new streaming request
-            async for chunk in await async_client.chat(
-                self.model_name,
-                messages=self.messages,
-                stream=True
-            ):
-                if hasattr(chunk, 'message') and chunk.message.content:
-                    full_response += chunk.message.content
-                    message_placeholder.markdown(full_response + "▌")
+            with span('llm.chat', model=self.model_name, stream=True):
+                async for chunk in await async_client.chat(
+                    self.model_name,
+                    messages=self.context.prompt_messages(),
+                    options={'num_ctx': self.context.config.num_ctx},
+                    keep_alive=DEFAULT_KEEP_ALIVE,
+                    stream=True
+                ):
+                    if hasattr(chunk, 'message') and chunk.message.content:
+                        full_response += chunk.message.content
+                        message_placeholder.markdown(full_response + "▌")
+                    if getattr(chunk, 'done', False):
+                        self.context.record_response(chunk)
             
             # Update with final response
             message_placeholder.markdown(full_response)
-            self.messages.append({'role': 'assistant', 'content': full_response})
+            self.context.append({'role': 'assistant', 'content': full_response})
             return full_response
     
     def process_user_input_streaming(self, user_input, message_placeholder):
         """Process user input synchronously by running async function with streaming."""
-        return asyncio.run(self.async_process_user_input_streaming(user_input, message_placeholder))
+        with span('turn', model=self.model_name):
+            return asyncio.run(self.async_process_user_input_streaming(user_input, message_placeholder))
 
 def initialize_state():
     """Initialize session state variables."""
@@ -182,6 +256,9 @@ def initialize_state():
         st.session_state.webUI_messages = []
     if 'webUI_assistant' not in st.session_state:
         st.session_state.webUI_assistant = StockChatAssistant()
+        st.session_state.webUI_assistant.warm_up()
+    # Keep STOCK_AGENT_WATCHLIST tickers warm; only the first call starts the daemon
+    start_prefetch_from_env()
 
 def show_tools():
     """Show available and disabled tools."""
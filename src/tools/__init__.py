@@ -5,7 +5,10 @@ from .web_search import web_search
 from .audio_to_text import speech_to_text
 __all__ = [
     'scrape_yahoo_finance_news',
+    'scrape_yahoo_finance_news_batch',
+    'iter_yahoo_finance_news',
+    'aiter_yahoo_finance_news',
     'scrape_market_watch_news',
-    'web_search'
+    'web_search',
     'speech_to_text'
 ]
\ No newline at end of file
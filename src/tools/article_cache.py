@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from pydantic import BaseModel, Field
+
+
+def default_data_dir() -> str:
+    """Return the src/data directory used for persisted scraper state."""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(current_dir), 'data')
+
+
+def normalize_url(url: str) -> str:
+    """Normalize an article URL by dropping query parameters, fragments and case in the host."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, '', ''))
+
+
+class CacheEntry(BaseModel):
+    """A cached parsed article together with its HTTP validators."""
+    payload: Dict[str, Any] = Field(..., description="Parsed article fields")
+    etag: Optional[str] = Field(None, description="ETag returned with the article page")
+    last_modified: Optional[str] = Field(None, description="Last-Modified returned with the article page")
+    fetched_at: float = Field(..., description="Unix time the entry was last fetched or revalidated")
+    is_fresh: bool = Field(..., description="Whether the entry is still within its TTL")
+
+
+class ArticleCache:
+    """
+    Persistent SQLite cache of parsed articles keyed by normalized URL, with TTL and LRU eviction.
+
+    Lookups do not write: access times are kept in memory and written in batches,
+    so cache hits from many fetch threads are not serialized behind disk syncs.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 6 * 3600, max_entries: int = 5000,
+                 access_flush_size: int = 64):
+        self.path = path or os.path.join(default_data_dir(), 'article_cache.sqlite3')
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.access_flush_size = access_flush_size
+        self._pending_access: Dict[str, float] = {}
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_accessed ON articles (accessed_at)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for a URL, or None if it has never been cached."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, etag, last_modified, fetched_at FROM articles WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._pending_access[key] = now
+            if len(self._pending_access) >= self.access_flush_size:
+                self._flush_access()
+        payload, etag, last_modified, fetched_at = row
+        return CacheEntry(
+            payload=json.loads(payload),
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=fetched_at,
+            is_fresh=now - fetched_at < self.ttl,
+        )
+
+    def put(self, url: str, payload: Dict[str, Any], etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Store a parsed article and evict the least recently used entries over the size cap."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            # Eviction below orders by access time, so recorded lookups must be on disk first
+            self._flush_access()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(payload, ensure_ascii=False), etag, last_modified, now, now),
+            )
+            self._conn.execute(
+                """
+                DELETE FROM articles WHERE url IN (
+                    SELECT url FROM articles ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def _flush_access(self) -> None:
+        # Caller holds self._lock
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            "UPDATE articles SET accessed_at = MAX(accessed_at, ?) WHERE url = ?",
+            [(accessed_at, key) for key, accessed_at in self._pending_access.items()],
+        )
+        self._conn.commit()
+        self._pending_access.clear()
+
+    def flush(self) -> None:
+        """Write the access times of recent lookups to disk."""
+        with self._lock:
+            self._flush_access()
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as revalidated (e.g. after a 304 Not Modified response)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE articles SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, normalize_url(url)),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute("DELETE FROM articles")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_access()
+            self._conn.close()
+
+
+_lock = threading.Lock()
+_cache: Optional[ArticleCache] = None
+
+
+def configure_article_cache(path: Optional[str] = None, ttl: float = 6 * 3600,
+                            max_entries: int = 5000) -> ArticleCache:
+    """Replace the process-wide article cache."""
+    global _cache
+    with _lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = ArticleCache(path, ttl, max_entries)
+        return _cache
+
+
+def get_article_cache() -> ArticleCache:
+    """Return the process-wide article cache, creating it on first use."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = ArticleCache()
+        return _cache
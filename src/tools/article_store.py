@@ -0,0 +1,190 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Union
+
+from .article_cache import default_data_dir, normalize_url
+from .models import ArticleDetails, ArticleRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_source_timestamp ON articles (source, timestamp);
+CREATE INDEX IF NOT EXISTS idx_articles_timestamp ON articles (timestamp);
+CREATE TABLE IF NOT EXISTS article_tickers (
+    ticker TEXT NOT NULL,
+    key TEXT NOT NULL REFERENCES articles (key) ON DELETE CASCADE,
+    timestamp TEXT,
+    PRIMARY KEY (ticker, key)
+);
+CREATE INDEX IF NOT EXISTS idx_article_tickers_timestamp ON article_tickers (ticker, timestamp);
+CREATE TABLE IF NOT EXISTS refreshes (
+    ticker TEXT NOT NULL,
+    source TEXT NOT NULL,
+    refreshed_at REAL NOT NULL,
+    PRIMARY KEY (ticker, source)
+);
+"""
+
+_COLUMNS = "a.url, a.title, a.content, a.timestamp"
+
+
+class ArticleStore:
+    """
+    Local SQLite store of scraped articles keyed by normalized URL.
+
+    The database runs in WAL mode so several threads or processes can write
+    while others read. Articles are indexed by ticker, source and timestamp.
+    """
+
+    def __init__(self, path: Optional[str] = None, busy_timeout: float = 5.0):
+        self.path = path or os.path.join(default_data_dir(), 'articles.sqlite3')
+        self.busy_timeout = busy_timeout
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; SQLite connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def add_articles(self, articles: Iterable[Union[ArticleDetails, ArticleRecord]], ticker: Optional[str] = None,
+                     source: str = 'yahoo') -> int:
+        """Insert or update articles in a single transaction and return how many were written."""
+        now = time.time()
+        rows = []
+        ticker_rows = []
+        for article in articles:
+            key = normalize_url(article.url)
+            rows.append((key, article.url, source, article.title, article.content, article.timestamp, now))
+            if ticker:
+                ticker_rows.append((ticker.upper(), key, article.timestamp))
+        if not rows:
+            return 0
+
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO articles (key, url, source, title, content, timestamp, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    url = excluded.url, title = excluded.title, content = excluded.content,
+                    timestamp = excluded.timestamp, stored_at = excluded.stored_at
+                """,
+                rows,
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO article_tickers (ticker, key, timestamp) VALUES (?, ?, ?)",
+                ticker_rows,
+            )
+        return len(rows)
+
+    def get(self, url: str) -> Optional[ArticleDetails]:
+        """Return the stored article for a URL, if any."""
+        row = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM articles a WHERE a.key = ?", (normalize_url(url),)
+        ).fetchone()
+        return self._to_article(row) if row else None
+
+    def latest(self, ticker: Optional[str] = None, n: int = 10,
+               source: Optional[str] = None) -> List[ArticleDetails]:
+        """Return the n most recently published articles, optionally filtered by ticker and source."""
+        return self.query_range(ticker=ticker, source=source, limit=n)
+
+    def query_range(self, ticker: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                    source: Optional[str] = None, limit: Optional[int] = None) -> List[ArticleDetails]:
+        """
+        Return articles published between start (inclusive) and end (exclusive), newest first.
+
+        Timestamps are ISO 8601 strings, so they compare in chronological order.
+        """
+        if ticker:
+            query = f"SELECT {_COLUMNS} FROM article_tickers t JOIN articles a ON a.key = t.key WHERE t.ticker = ?"
+            params: list = [ticker.upper()]
+            column = "t.timestamp"
+        else:
+            query = f"SELECT {_COLUMNS} FROM articles a WHERE 1 = 1"
+            params = []
+            column = "a.timestamp"
+        if source:
+            query += " AND a.source = ?"
+            params.append(source)
+        if start:
+            query += f" AND {column} >= ?"
+            params.append(start)
+        if end:
+            query += f" AND {column} < ?"
+            params.append(end)
+        query += f" ORDER BY {column} DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [self._to_article(row) for row in self._connection().execute(query, params)]
+
+    def count(self, ticker: Optional[str] = None) -> int:
+        """Return the number of stored articles, optionally for one ticker."""
+        if ticker:
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM article_tickers WHERE ticker = ?", (ticker.upper(),)
+            ).fetchone()[0]
+        return self._connection().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def mark_refreshed(self, ticker: str, source: str = 'yahoo', at: Optional[float] = None) -> None:
+        """Record that the articles of a ticker were just refreshed from a source."""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO refreshes (ticker, source, refreshed_at) VALUES (?, ?, ?)",
+                (ticker.upper(), source, time.time() if at is None else at),
+            )
+
+    def last_refreshed(self, ticker: str, source: str = 'yahoo') -> Optional[float]:
+        """Return the epoch time of the last refresh of a ticker from a source, if any."""
+        row = self._connection().execute(
+            "SELECT refreshed_at FROM refreshes WHERE ticker = ? AND source = ?", (ticker.upper(), source)
+        ).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _to_article(row) -> ArticleDetails:
+        url, title, content, timestamp = row
+        return ArticleDetails(title=title, content=content, url=url, timestamp=timestamp)
+
+
+_lock = threading.Lock()
+_store: Optional[ArticleStore] = None
+
+
+def configure_article_store(path: Optional[str] = None) -> ArticleStore:
+    """Replace the process-wide article store."""
+    global _store
+    with _lock:
+        _store = ArticleStore(path)
+        return _store
+
+
+def get_article_store() -> ArticleStore:
+    """Return the process-wide article store, creating it on first use."""
+    global _store
+    with _lock:
+        if _store is None:
+            _store = ArticleStore()
+        return _store
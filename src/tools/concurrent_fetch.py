@@ -0,0 +1,100 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+T = TypeVar("T")
+
+
+class HostLimiter:
+    """Bounds the number of in-flight requests per host."""
+
+    def __init__(self, max_per_host: int):
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be at least 1")
+        self.max_per_host = max_per_host
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """Return the semaphore guarding the host of the given URL."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._semaphores[host]
+
+
+def iter_fetch(
+    urls: Sequence[str],
+    fetch: Callable[[str], T],
+    max_workers: int = 8,
+    max_per_host: int = 4,
+    deadline: Optional[float] = None,
+) -> Iterator[Tuple[int, T]]:
+    """
+    Run fetch(url) concurrently and yield (index, result) pairs as they complete.
+
+    Args:
+        urls: URLs to fetch; the index in this sequence is yielded with each result.
+        fetch: Blocking callable that downloads and parses a single URL.
+        max_workers: Size of the worker thread pool.
+        max_per_host: Maximum number of concurrent requests to the same host.
+        deadline: Overall time budget in seconds. Work still running when it
+            expires is abandoned and its results are never yielded.
+    """
+    if not urls:
+        return
+
+    limiter = HostLimiter(max_per_host)
+
+    def run(url: str) -> T:
+        with limiter.semaphore(url):
+            return fetch(url)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))))
+    # Workers run in the caller's context so settings like request priority carry over
+    futures = {
+        executor.submit(contextvars.copy_context().run, run, url): index
+        for index, url in enumerate(urls)
+    }
+    end = time.monotonic() + deadline if deadline is not None else None
+    pending = set(futures)
+
+    try:
+        while pending:
+            timeout = None if end is None else max(0.0, end - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"Deadline of {deadline}s reached, abandoning {len(pending)} pending requests")
+                break
+            for future in done:
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error fetching {urls[index]}: {e}")
+                    continue
+                yield index, result
+    finally:
+        # Do not wait for stragglers: the caller only gets what finished in time.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_all(
+    urls: Sequence[str],
+    fetch: Callable[[str], T],
+    max_workers: int = 8,
+    max_per_host: int = 4,
+    deadline: Optional[float] = None,
+) -> List[Optional[T]]:
+    """Fetch all URLs concurrently and return results in the original order.
+
+    Entries that failed or did not finish before the deadline are None.
+    """
+    results: List[Optional[T]] = [None] * len(urls)
+    for index, result in iter_fetch(urls, fetch, max_workers, max_per_host, deadline):
+        results[index] = result
+    return results
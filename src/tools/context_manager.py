@@ -0,0 +1,151 @@
+from typing import Any, Callable, List, Optional
+
+from pydantic import BaseModel, Field
+
+# Returns the (estimated) number of tokens in a piece of text
+Tokenizer = Callable[[str], int]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap tokenizer estimate of about four characters per token for English text."""
+    return (len(text) + 3) // 4
+
+
+def message_role(message: Any) -> str:
+    return message.get('role', '') if isinstance(message, dict) else getattr(message, 'role', '')
+
+
+def message_content(message: Any) -> str:
+    content = message.get('content') if isinstance(message, dict) else getattr(message, 'content', None)
+    return content or ''
+
+
+def _tool_calls(message: Any) -> Any:
+    return message.get('tool_calls') if isinstance(message, dict) else getattr(message, 'tool_calls', None)
+
+
+class ContextConfig(BaseModel):
+    """Configuration model for the conversation context."""
+    max_prompt_tokens: int = Field(24576, description="Token budget for the messages sent with each request")
+    max_response_tokens: int = Field(8192, description="Tokens reserved in the context window for the reply")
+    keep_recent_turns: int = Field(2, description="Most recent user turns that are always kept verbatim")
+    message_overhead: int = Field(4, description="Tokens added per message for role and formatting markers")
+    tool_summary_chars: int = Field(300, description="Characters of an evicted tool output kept as its summary")
+
+    @property
+    def num_ctx(self) -> int:
+        """Context window to request from the model server."""
+        return self.max_prompt_tokens + self.max_response_tokens
+
+
+class TurnMetrics(BaseModel):
+    """Prompt size of one request to the model."""
+    estimated_prompt_tokens: int = Field(..., description="Tokenizer estimate of the prompt sent")
+    messages: int = Field(..., description="Number of messages sent")
+    evicted_tokens: int = Field(0, description="Tokens freed by summarizing or dropping history for this request")
+    prompt_eval_count: Optional[int] = Field(None, description="Prompt tokens reported by the model server")
+    prompt_eval_seconds: Optional[float] = Field(None, description="Prefill time reported by the model server")
+
+
+class ConversationContext:
+    """
+    Conversation history kept within a prompt token budget.
+
+    The system prompt and the most recent turns are always sent verbatim.
+    When the history exceeds the budget, older tool outputs are first replaced
+    by a short summary, then the oldest whole turns are dropped, so prefill
+    cost stays flat over long sessions.
+    """
+
+    def __init__(self, system_prompt: str, config: Optional[ContextConfig] = None,
+                 tokenizer: Optional[Tokenizer] = None):
+        self.system_prompt = system_prompt
+        self.config = config or ContextConfig()
+        self.tokenizer = tokenizer or estimate_tokens
+        self.metrics: List[TurnMetrics] = []
+        self.messages: List[Any] = []
+        self._tokens: List[int] = []
+        self.clear()
+
+    def clear(self) -> None:
+        self.messages = [{'role': 'system', 'content': self.system_prompt}]
+        self._tokens = [self.count_tokens(self.messages[0])]
+
+    def count_tokens(self, message: Any) -> int:
+        text = message_content(message)
+        if tool_calls := _tool_calls(message):
+            text += str(tool_calls)
+        return self.tokenizer(text) + self.config.message_overhead
+
+    def append(self, message: Any) -> None:
+        """Add a message dict or a model response message to the history."""
+        self.messages.append(message)
+        self._tokens.append(self.count_tokens(message))
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self._tokens)
+
+    def _protected_start(self) -> int:
+        """Index of the first message of the turns that are always kept verbatim."""
+        keep = self.config.keep_recent_turns
+        if keep <= 0:
+            return len(self.messages)
+        user_indexes = [i for i, message in enumerate(self.messages) if message_role(message) == 'user']
+        return user_indexes[-keep] if len(user_indexes) >= keep else 1
+
+    def _summarize_tool_outputs(self, end: int) -> int:
+        freed = 0
+        for i in range(1, end):
+            if self.total_tokens <= self.config.max_prompt_tokens:
+                break
+            message = self.messages[i]
+            if not isinstance(message, dict) or message_role(message) != 'tool' or message.get('evicted'):
+                continue
+            content = message_content(message)
+            summary = {
+                'role': 'tool',
+                'name': message.get('name'),
+                'content': f"[Earlier tool output truncated from {self._tokens[i]} tokens] "
+                           f"{content[:self.config.tool_summary_chars]}",
+                'evicted': True,
+            }
+            tokens = self.count_tokens(summary)
+            if tokens < self._tokens[i]:
+                freed += self._tokens[i] - tokens
+                self.messages[i], self._tokens[i] = summary, tokens
+        return freed
+
+    def _drop_oldest_turns(self, end: int) -> int:
+        freed = 0
+        while self.total_tokens > self.config.max_prompt_tokens and end > 1:
+            # A turn runs from a user message up to the next one, so tool results never lose their call
+            next_user = next((i for i in range(2, end) if message_role(self.messages[i]) == 'user'), end)
+            freed += sum(self._tokens[1:next_user])
+            del self.messages[1:next_user]
+            del self._tokens[1:next_user]
+            end -= next_user - 1
+        return freed
+
+    def prompt_messages(self) -> List[Any]:
+        """Trim the history to the token budget and return the messages to send."""
+        end = self._protected_start()
+        freed = 0
+        if self.total_tokens > self.config.max_prompt_tokens:
+            freed += self._summarize_tool_outputs(end)
+            freed += self._drop_oldest_turns(self._protected_start())
+        self.metrics.append(TurnMetrics(
+            estimated_prompt_tokens=self.total_tokens, messages=len(self.messages), evicted_tokens=freed,
+        ))
+        # The evicted marker is internal bookkeeping and is not sent to the model
+        return [{k: v for k, v in m.items() if k != 'evicted'} if isinstance(m, dict) else m for m in self.messages]
+
+    def record_response(self, response: Any) -> Optional[TurnMetrics]:
+        """Attach the prompt token count and prefill time reported for the last request."""
+        if not self.metrics:
+            return None
+        metrics = self.metrics[-1]
+        metrics.prompt_eval_count = getattr(response, 'prompt_eval_count', None)
+        duration = getattr(response, 'prompt_eval_duration', None)
+        metrics.prompt_eval_seconds = duration / 1e9 if duration else None
+        return metrics
@@ -0,0 +1,113 @@
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, TypeVar
+
+from .article_cache import normalize_url
+
+T = TypeVar("T")
+
+_TOKEN = re.compile(r'\w+')
+_BITS = 64
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """Return a 64-bit SimHash fingerprint of the text built from word shingles."""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) > shingle_size:
+        features = (' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1))
+    else:
+        features = iter([' '.join(tokens)])
+
+    weights = [0] * _BITS
+    for feature in features:
+        h = _hash64(feature)
+        for bit in range(_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(_BITS) if weights[bit] > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def article_text(article: Any) -> str:
+    """Return the title and content of an ArticleDetails or a scraper article dict."""
+    if isinstance(article, dict):
+        title, content = article.get('title', ''), article.get('content', '')
+    else:
+        title, content = article.title, article.content
+    if isinstance(content, list):
+        content = '\n\n'.join(content)
+    return f"{title}\n{content}"
+
+
+def article_url(article: Any) -> Optional[str]:
+    return article.get('url') if isinstance(article, dict) else getattr(article, 'url', None)
+
+
+class SimHashIndex:
+    """
+    In-memory LSH index over SimHash fingerprints.
+
+    Fingerprints are split into bands; two fingerprints within max_distance bits
+    are guaranteed to share at least one band when bands > max_distance, so a
+    lookup only compares against candidates from matching bands.
+    """
+
+    def __init__(self, max_distance: int = 6, bands: int = 8):
+        if bands <= max_distance:
+            raise ValueError("bands must be greater than max_distance to guarantee recall")
+        self.max_distance = max_distance
+        self.bands = bands
+        self._band_bits = _BITS // bands
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._urls: Set[str] = set()
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self._band_bits) - 1
+        return [fingerprint >> (band * self._band_bits) & mask for band in range(self.bands)]
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """Return a stored fingerprint within max_distance bits, if any."""
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            for candidate in self._buckets[band].get(key, ()):
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return candidate
+        return None
+
+    def add(self, fingerprint: int) -> None:
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            self._buckets[band].setdefault(key, []).append(fingerprint)
+
+    def add_if_new(self, article: Any) -> bool:
+        """Index the article and return True, or return False if it duplicates an indexed one."""
+        url = article_url(article)
+        key = normalize_url(url) if url else None
+        if key and key in self._urls:
+            return False
+        fingerprint = simhash(article_text(article))
+        if self.find(fingerprint) is not None:
+            return False
+        self.add(fingerprint)
+        if key:
+            self._urls.add(key)
+        return True
+
+
+def collapse_near_duplicates(articles: Iterable[T], index: Optional[SimHashIndex] = None,
+                             max_distance: int = 6) -> List[T]:
+    """
+    Drop articles whose URL or content duplicates an earlier one, keeping the first occurrence.
+
+    Pass a shared index to collapse duplicates across several calls (e.g. several tickers or sources).
+    """
+    index = index or SimHashIndex(max_distance=max_distance, bands=max_distance + 2)
+    articles = list(articles)
+    unique = [article for article in articles if index.add_if_new(article)]
+    if len(unique) < len(articles):
+        print(f"Collapsed {len(articles) - len(unique)} near-duplicate articles")
+    return unique
@@ -0,0 +1,131 @@
+import os
+import re
+from typing import List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+from pydantic import BaseModel, Field
+
+from .tracing import span
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+    except ImportError:
+        _SelectolaxParser = None
+
+try:
+    import lxml  # noqa: F401
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
+# Backends in order of preference; 'html.parser' is always available
+BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+
+class ArticleSelectors(BaseModel):
+    """CSS selectors describing where an article's fields live on a page."""
+    title: str = Field(..., description="Selector of the title element")
+    content: Optional[str] = Field(None, description="Selector of the content container; None searches the whole page")
+    paragraph: str = Field('p', description="Selector of the paragraphs inside the content container")
+    time: str = Field(..., description="Selector of the element carrying the publication time")
+    time_attr: str = Field('datetime', description="Attribute of the time element holding the timestamp")
+    keep_tags: List[str] = Field(default_factory=list, description="Tag names kept in a partial parse")
+    keep_classes: List[str] = Field(
+        default_factory=list,
+        description="Class names kept in a partial parse; takes precedence over keep_tags"
+    )
+
+    def strainer(self) -> Optional[SoupStrainer]:
+        """Build a SoupStrainer limited to the nodes the selectors read, or None for a full parse."""
+        if self.keep_classes:
+            pattern = '|'.join(re.escape(name) for name in self.keep_classes)
+            return SoupStrainer(class_=re.compile(rf'(?:^|\s)(?:{pattern})(?:\s|$)'))
+        if self.keep_tags:
+            return SoupStrainer(self.keep_tags)
+        return None
+
+
+class ParsedArticle(BaseModel):
+    """Raw fields read from an article page, before any site-specific cleanup."""
+    title: Optional[str] = Field(None, description="Text of the title element, None if it was not found")
+    paragraphs: List[str] = Field(default_factory=list, description="Text of each paragraph in document order")
+    timestamp: Optional[str] = Field(None, description="Publication timestamp attribute, if present")
+
+
+def available_backends() -> List[str]:
+    """Return the parser backends that can be used in this environment."""
+    backends = []
+    if _SelectolaxParser is not None:
+        backends.append('selectolax')
+    if _HAS_LXML:
+        backends.append('lxml')
+    backends.append('html.parser')
+    return backends
+
+
+def default_backend() -> str:
+    """Return the backend set in STOCK_AGENT_HTML_PARSER, or the fastest installed one."""
+    backend = os.getenv('STOCK_AGENT_HTML_PARSER')
+    if backend:
+        return backend
+    return available_backends()[0]
+
+
+def _parse_with_selectolax(html: str, selectors: ArticleSelectors) -> ParsedArticle:
+    tree = _SelectolaxParser(html)
+    title = tree.css_first(selectors.title)
+    container = tree.css_first(selectors.content) if selectors.content else tree
+    paragraphs = [node.text() for node in container.css(selectors.paragraph)] if container else []
+    time_node = tree.css_first(selectors.time)
+    return ParsedArticle(
+        title=title.text() if title is not None else None,
+        paragraphs=paragraphs,
+        timestamp=time_node.attributes.get(selectors.time_attr) if time_node is not None else None,
+    )
+
+
+def _parse_with_soup(html: str, selectors: ArticleSelectors, features: str, partial: bool) -> ParsedArticle:
+    strainer = selectors.strainer() if partial else None
+    soup = BeautifulSoup(html, features, parse_only=strainer)
+    title = soup.select_one(selectors.title)
+    container = soup.select_one(selectors.content) if selectors.content else soup
+    paragraphs = [p.get_text() for p in container.select(selectors.paragraph)] if container else []
+    time_element = soup.select_one(selectors.time)
+    return ParsedArticle(
+        title=title.get_text() if title is not None else None,
+        paragraphs=paragraphs,
+        timestamp=time_element.get(selectors.time_attr) if time_element is not None else None,
+    )
+
+
+def parse_article_html(html: str, selectors: ArticleSelectors, backend: Optional[str] = None,
+                       partial: bool = True) -> ParsedArticle:
+    """
+    Read the title, paragraphs and timestamp of an article page.
+
+    Args:
+        html: Page markup.
+        selectors: Where the fields live on the page.
+        backend: One of BACKENDS; defaults to default_backend().
+        partial: For BeautifulSoup backends, only build the nodes the selectors read.
+    """
+    backend = backend or default_backend()
+    with span('parse', backend=backend, bytes=len(html)):
+        return _parse_with_backend(html, selectors, backend, partial)
+
+
+def _parse_with_backend(html: str, selectors: ArticleSelectors, backend: str, partial: bool) -> ParsedArticle:
+    if backend == 'selectolax':
+        if _SelectolaxParser is None:
+            raise ValueError("selectolax backend requested but selectolax is not installed")
+        return _parse_with_selectolax(html, selectors)
+    if backend == 'lxml':
+        if not _HAS_LXML:
+            raise ValueError("lxml backend requested but lxml is not installed")
+        return _parse_with_soup(html, selectors, 'lxml', partial)
+    if backend == 'html.parser':
+        return _parse_with_soup(html, selectors, 'html.parser', partial)
+    raise ValueError(f"Unknown HTML parser backend: {backend}")
@@ -0,0 +1,148 @@
+import threading
+from typing import Dict, List, Optional
+
+import requests
+from pydantic import BaseModel, Field
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .rate_limiter import Priority, get_scheduler
+from .tracing import span
+
+# Only advertise brotli when urllib3 is able to decode it
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+
+class HttpClientConfig(BaseModel):
+    """Configuration model for the shared HTTP client."""
+    pool_connections: int = Field(10, description="Number of hosts to keep connection pools for")
+    pool_maxsize: int = Field(10, description="Default number of keep-alive connections per host")
+    host_pool_sizes: Dict[str, int] = Field(
+        default_factory=lambda: {"finance.yahoo.com": 16, "www.marketwatch.com": 8},
+        description="Per-host overrides for the number of keep-alive connections"
+    )
+    retries: int = Field(3, description="Maximum number of retries for failed requests")
+    backoff_factor: float = Field(0.5, description="Exponential backoff factor between retries")
+    retry_statuses: List[int] = Field(
+        default_factory=lambda: [500, 502, 503, 504],
+        description="HTTP status codes that trigger a retry; 429 is handled by the request scheduler"
+    )
+    timeout: float = Field(10.0, description="Default timeout in seconds for each request")
+
+
+_lock = threading.Lock()
+_config = HttpClientConfig()
+_session: Optional[requests.Session] = None
+
+
+def _make_adapter(config: HttpClientConfig, pool_maxsize: int) -> HTTPAdapter:
+    retry = Retry(
+        total=config.retries,
+        backoff_factor=config.backoff_factor,
+        status_forcelist=config.retry_statuses,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return HTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+
+
+def _build_session(config: HttpClientConfig) -> requests.Session:
+    session = requests.Session()
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    session.mount("https://", _make_adapter(config, config.pool_maxsize))
+    session.mount("http://", _make_adapter(config, config.pool_maxsize))
+    for host, size in config.host_pool_sizes.items():
+        session.mount(f"https://{host}/", _make_adapter(config, size))
+    return session
+
+
+def configure_http_client(config: HttpClientConfig) -> None:
+    """Replace the process-wide HTTP client configuration and reset its pools."""
+    global _config, _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _config = config
+        _session = None
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled HTTP session."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session(_config)
+        return _session
+
+
+def http_get(url: str, priority: Optional[Priority] = None, **kwargs) -> requests.Response:
+    """
+    Issue a GET request through the shared session, like requests.get.
+
+    Every attempt first waits for a slot from the per-domain request scheduler
+    at the given priority (defaults to the current request_priority context).
+    That wait is bounded by the request timeout and raises requests.Timeout when
+    it runs out, like a request that never got a response.
+    429 responses are retried after the scheduler's Retry-After aware backoff.
+    """
+    kwargs.setdefault("timeout", _config.timeout)
+    timeout = kwargs["timeout"]
+    # A (connect, read) tuple bounds the wait by the connect timeout
+    wait_timeout = timeout[0] if isinstance(timeout, tuple) else timeout
+    scheduler = get_scheduler()
+    session = get_session()
+    with span("http.get", url=url) as s:
+        waited = 0.0
+        for attempt in range(_config.retries + 1):
+            try:
+                waited += scheduler.acquire(url, priority, timeout=wait_timeout)
+            except TimeoutError as e:
+                s.set(attempts=attempt, scheduler_wait_ms=(waited + wait_timeout) * 1000)
+                raise requests.Timeout(str(e)) from e
+            response = session.get(url, **kwargs)
+            scheduler.record_response(url, response.status_code, response.headers.get("Retry-After"))
+            if response.status_code != 429 or attempt == _config.retries:
+                break
+            response.close()
+        s.set(status=response.status_code, bytes=len(response.content), attempts=attempt + 1,
+              scheduler_wait_ms=waited * 1000)
+        return response
+
+
+def get_pool_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Return connection pool statistics keyed by host.
+
+    A request served on an existing keep-alive connection counts as a hit;
+    a request that had to open a new connection counts as a miss.
+    """
+    with _lock:
+        session = _session
+    stats: Dict[str, Dict[str, int]] = {}
+    if session is None:
+        return stats
+
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            entry = stats.setdefault(pool.host, {"requests": 0, "hits": 0, "misses": 0})
+            entry["requests"] += pool.num_requests
+            entry["misses"] += pool.num_connections
+            entry["hits"] += max(0, pool.num_requests - pool.num_connections)
+    return stats
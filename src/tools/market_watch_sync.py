@@ -1,106 +1,156 @@
-import requests
 from bs4 import BeautifulSoup
-import json
-from datetime import datetime
+from typing import List, Optional
+from .http_client import http_get
+from .html_parser import ArticleSelectors, parse_article_html
+from .article_store import get_article_store
+from .concurrent_fetch import fetch_all
+from .models import ArticleDetails
+from .tracing import span
+from .yahoo_finance_sync import ScraperConfig
+
+# Only the nodes read by parse_article are built in a partial parse
+MARKET_WATCH_ARTICLE_SELECTORS = ArticleSelectors(
+    title='h1.article__headline.css-14q97tr',
+    time='time',
+    keep_tags=['h1', 'p', 'time'],
+)
+
+# Listing layouts seen on MarketWatch quote pages
+MARKET_WATCH_LISTING_SELECTORS = [
+    'h3.article__headline a.link',
+    'div.article__headline a',
+    'a.article__headline'
+]
+
+
+class MarketWatchScraper:
+    """Class for scraping news articles from MarketWatch."""
+
+    def __init__(self, config: ScraperConfig):
+        self.config = config
+        # More comprehensive headers to mimic a real browser
+        self.headers = {
+            'User-Agent': config.user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Referer': 'https://www.marketwatch.com/',
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1'
+        }
+
+    @property
+    def listing_url(self) -> str:
+        """URL of the quote page listing news for the configured stock symbol."""
+        return f"https://www.marketwatch.com/investing/stock/{self.config.stock_symbol}?mod=search_symbol"
 
-def extract_article_details(url, headers):
-    try:
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
+    def parse_article(self, html: str, url: str) -> ArticleDetails:
+        """Parse the details of a single article page."""
+        page = parse_article_html(html, MARKET_WATCH_ARTICLE_SELECTORS, backend=self.config.parser_backend)
 
         # Title extraction
-        title = soup.find('h1', class_='article__headline css-14q97tr')
-        title_text = title.text.strip() if title else "No title found"
+        title_text = page.title.strip() if page.title is not None else "No title found"
 
         # Content extraction
-        contents = soup.find_all('p')
-        content_text = [content.text.strip() for content in contents if content.text.strip()]
-
-        # Time extraction
-        time_element = soup.find('time')
-        article_time = time_element['datetime'] if time_element and time_element.has_attr('datetime') else None
-
-        return {
-            'title': title_text,
-            'content': content_text,
-            'url': url,
-            'timestamp': article_time
-        }
-    except Exception as e:
-        print(f"Error extracting details from {url}: {e}")
-        return None
-
-def scrape_market_watch_news(stock):
-    # Use the news-specific URL
-    url = f"https://www.marketwatch.com/investing/stock/{stock}?mod=search_symbol"
-
-    # More comprehensive headers to mimic a real browser
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Referer': 'https://www.marketwatch.com/',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
-
-    # Send request with headers
-    response = requests.get(url, headers=headers)
-    print(f"Status Code: {response.status_code}")
-
-    # Check if request was successful
-    if response.status_code != 200:
-        print("Failed to retrieve the page. Response content:")
-        print(response.text)
-        return json.dumps([])
-
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    # More comprehensive URL extraction
-    article_urls = []
-    
-    # Try multiple selectors
-    selectors = [
-        'h3.article__headline a.link',
-        'div.article__headline a',
-        'a.article__headline'
-    ]
-
-    for selector in selectors:
-        links = soup.select(selector)
-        urls = [
-            link.get('href') 
-            for link in links 
-            if link.get('href') and 'marketwatch.com/story/' in link.get('href')
-        ]
-        article_urls.extend(urls)
-
-    # Remove duplicates
-    article_urls = list(dict.fromkeys(article_urls))
-
-    print(f"Found {len(article_urls)} articles")
-    print("Article URLs:", article_urls)
-
-    # Extract details for each article  
-    articles = []
-    for article_url in article_urls[:10]:  # Limit to first 10 articles
+        paragraphs = [text.strip() for text in page.paragraphs if text.strip()]
+
+        return ArticleDetails(
+            title=title_text,
+            content='\n\n'.join(paragraphs),
+            url=url,
+            timestamp=page.timestamp
+        )
+
+    def extract_article_details(self, url: str) -> Optional[ArticleDetails]:
+        """Extract details from a single article page."""
+        with span('marketwatch.article', url=url):
+            try:
+                response = http_get(url, headers=self.headers, timeout=self.config.request_timeout)
+                return self.parse_article(response.text, url)
+            except Exception as e:
+                print(f"Error extracting details from {url}: {e}")
+                return None
+
+    def parse_listing(self, html: str) -> List[str]:
+        """Return the unique story URLs of a quote page in listing order."""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        article_urls = []
+        for selector in MARKET_WATCH_LISTING_SELECTORS:
+            for link in soup.select(selector):
+                href = link.get('href')
+                if href and 'marketwatch.com/story/' in href:
+                    article_urls.append(href)
+
+        # Remove duplicates
+        return list(dict.fromkeys(article_urls))
+
+    def fetch_article_urls(self) -> List[str]:
+        """Fetch the quote page and return the unique story URLs in listing order."""
+        with span('marketwatch.listing', ticker=self.config.stock_symbol) as s:
+            response = http_get(self.listing_url, headers=self.headers, timeout=self.config.request_timeout)
+            if response.status_code != 200:
+                print(f"Failed to retrieve {self.listing_url}: status code {response.status_code}")
+                return []
+            urls = self.parse_listing(response.text)
+            s.set(articles=len(urls))
+            return urls
+
+    def fetch_articles(self, urls: List[str]) -> List[ArticleDetails]:
+        """Fetch articles concurrently; results keep the order of the given URLs."""
+        results = fetch_all(
+            urls,
+            self.extract_article_details,
+            max_workers=self.config.max_workers,
+            max_per_host=self.config.max_per_host,
+            deadline=self.config.deadline,
+        )
+        return [article for article in results if article]
+
+    def scrape_news(self) -> List[ArticleDetails]:
+        """Scrape news articles for the configured stock symbol."""
+        print(f"Starting to scrape MarketWatch news for {self.config.stock_symbol}")
+
+        with span('marketwatch.scrape_news', ticker=self.config.stock_symbol):
+            return self._scrape_news()
+
+    def _scrape_news(self) -> List[ArticleDetails]:
         try:
-            article_details = extract_article_details(article_url, headers)
-            if article_details:
-                articles.append(article_details)
+            article_urls = self.fetch_article_urls()
+
+            max_articles = min(self.config.max_articles, len(article_urls))
+            print(f"Found {len(article_urls)} articles, processing first {max_articles}")
+
+            return self.fetch_articles(article_urls[:max_articles])
+
         except Exception as e:
-            print(f"Error extracting details for {article_url}: {e}")
+            print(f"Error scraping MarketWatch news for {self.config.stock_symbol}: {e}")
+            return []
+
+    def save_articles(self, articles: List[ArticleDetails]) -> int:
+        """Save scraped articles to the local article store."""
+        if not articles:
+            print("No articles to save")
+            return 0
+
+        saved = get_article_store().add_articles(articles, ticker=self.config.stock_symbol, source='marketwatch')
+        print(f"Saved {saved} articles for {self.config.stock_symbol} to the article store")
+        return saved
+
+
+def scrape_market_watch_news(stock: str, max_articles: int = 10, save: bool = False) -> List[ArticleDetails]:
+    """Scrape MarketWatch news for a stock symbol, optionally saving it to the article store."""
+    config = ScraperConfig(stock_symbol=stock, max_articles=max_articles)
+    scraper = MarketWatchScraper(config)
+    articles = scraper.scrape_news()
+
+    if save and articles:
+        scraper.save_articles(articles)
 
-    print(f"Saved {len(articles)} articles")
-    json_string = json.dumps(articles)
+    return articles
 
-    filename = f"{stock}_news_articles_marketWatch.json"
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(articles, f, ensure_ascii=False, indent=2)
-    return json_string
 
 # Run the scraper
 if __name__ == "__main__":
     stock = "NVDA"
-    articles = market_watch_news(stock)
+    articles = scrape_market_watch_news(stock)
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+# How long Ollama keeps the model loaded after the last request
+DEFAULT_KEEP_ALIVE = os.getenv('STOCK_AGENT_KEEP_ALIVE', '30m')
+
+
+class WarmupReport(BaseModel):
+    """Timings of a model warm-up request, as reported by the Ollama server."""
+    model: str
+    load_seconds: float = Field(0.0, description="Time spent loading the model into memory")
+    prompt_eval_seconds: float = Field(0.0, description="Time spent prefilling the stable prompt prefix")
+    prompt_eval_count: int = Field(0, description="Tokens in the prefilled prompt prefix")
+    total_seconds: float = Field(0.0, description="Wall-clock time of the whole warm-up")
+
+    def __str__(self) -> str:
+        return (f"Warm-up of {self.model}: load {self.load_seconds:.2f}s, "
+                f"prefill {self.prompt_eval_seconds:.2f}s ({self.prompt_eval_count} tokens), "
+                f"total {self.total_seconds:.2f}s")
+
+
+def _warmup_options(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # Generate a single token: the point is loading the model and caching the prefix.
+    # num_ctx must match the chat requests, otherwise Ollama reloads the model on the first turn.
+    return {**(options or {}), 'num_predict': 1}
+
+
+def _report(model: str, response: Any, start: float) -> WarmupReport:
+    return WarmupReport(
+        model=model,
+        load_seconds=(getattr(response, 'load_duration', None) or 0) / 1e9,
+        prompt_eval_seconds=(getattr(response, 'prompt_eval_duration', None) or 0) / 1e9,
+        prompt_eval_count=getattr(response, 'prompt_eval_count', None) or 0,
+        total_seconds=time.perf_counter() - start,
+    )
+
+
+def warm_up(client: Any, model: str, messages: Sequence[Any], tools: Optional[List[Any]] = None,
+            options: Optional[Dict[str, Any]] = None, keep_alive: Any = DEFAULT_KEEP_ALIVE) -> WarmupReport:
+    """
+    Load the model and prefill the stable prompt prefix with an ollama.Client.
+
+    Pass the same system prompt, tool schemas and options the chat requests use,
+    so the server can reuse the cached prefix on the first real turn.
+    """
+    start = time.perf_counter()
+    response = client.chat(model, messages=list(messages), tools=tools, options=_warmup_options(options),
+                           keep_alive=keep_alive)
+    return _report(model, response, start)
+
+
+async def awarm_up(client: Any, model: str, messages: Sequence[Any], tools: Optional[List[Any]] = None,
+                   options: Optional[Dict[str, Any]] = None, keep_alive: Any = DEFAULT_KEEP_ALIVE) -> WarmupReport:
+    """Async variant of warm_up for an ollama.AsyncClient."""
+    start = time.perf_counter()
+    response = await client.chat(model, messages=list(messages), tools=tools, options=_warmup_options(options),
+                                 keep_alive=keep_alive)
+    return _report(model, response, start)
+
+
+_lock = threading.Lock()
+_warm_models: Dict[str, WarmupReport] = {}
+
+
+def warm_up_once(client: Any, model: str, messages: Sequence[Any], **kwargs) -> Optional[WarmupReport]:
+    """
+    Warm up a model once per process, e.g. from a Streamlit script that reruns on every interaction.
+
+    Returns the report of the first warm-up; failures are printed and retried on the next call.
+    """
+    with _lock:
+        if model in _warm_models:
+            return _warm_models[model]
+        try:
+            report = warm_up(client, model, messages, **kwargs)
+        except Exception as e:
+            print(f"Error warming up {model}: {e}")
+            return None
+        print(report)
+        _warm_models[model] = report
+        return report
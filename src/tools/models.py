@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from pydantic import BaseModel, Field, field_validator, ConfigDict
+
+
+class ArticleDetails(BaseModel):
+    """Model representing a news article's details."""
+    title: str = Field(..., description="Title of the article")
+    content: str = Field(..., description="Main content of the article")
+    url: str = Field(..., description="URL of the article")  # Changed from HttpUrl to str
+    timestamp: Optional[str] = Field(None, description="Publication timestamp of the article")
+    
+    @field_validator('content')
+    @classmethod
+    def clean_content(cls, v: str) -> str:
+        # Clean content if needed
+        return v
+    
+    model_config = ConfigDict(
+        arbitrary_types_allowed=True
+    )
+
+
+class ArticleRecord:
+    """
+    Lightweight article record for trusted, already-normalized data.
+
+    Skips pydantic model machinery entirely; convert with to_model() when an
+    ArticleDetails is needed at an API boundary.
+    """
+    __slots__ = ('title', 'content', 'url', 'timestamp')
+
+    def __init__(self, title: str, content: str, url: str, timestamp: Optional[str] = None):
+        self.title = title
+        self.content = content
+        self.url = url
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_model(cls, article: ArticleDetails) -> 'ArticleRecord':
+        return cls(article.title, article.content, article.url, article.timestamp)
+
+    def to_model(self) -> ArticleDetails:
+        """Build the equivalent ArticleDetails."""
+        # The validated constructor runs in pydantic-core and beats model_construct
+        # (see benchmarks/bench_article_records.py)
+        return ArticleDetails(title=self.title, content=self.content, url=self.url, timestamp=self.timestamp)
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        """Same layout as ArticleDetails.model_dump()."""
+        return {'title': self.title, 'content': self.content, 'url': self.url, 'timestamp': self.timestamp}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ArticleRecord):
+            return NotImplemented
+        return (self.title, self.content, self.url, self.timestamp) == \
+            (other.title, other.content, other.url, other.timestamp)
+
+    def __repr__(self) -> str:
+        return f"ArticleRecord(title={self.title!r}, url={self.url!r}, timestamp={self.timestamp!r})"
+
+
+class ArticleBatch:
+    """Columnar batch of articles: one list per field instead of one object per article."""
+    __slots__ = ('titles', 'contents', 'urls', 'timestamps')
+
+    def __init__(self, titles: Optional[List[str]] = None, contents: Optional[List[str]] = None,
+                 urls: Optional[List[str]] = None, timestamps: Optional[List[Optional[str]]] = None):
+        self.titles = titles if titles is not None else []
+        self.contents = contents if contents is not None else []
+        self.urls = urls if urls is not None else []
+        self.timestamps = timestamps if timestamps is not None else []
+        if not len(self.titles) == len(self.contents) == len(self.urls) == len(self.timestamps):
+            raise ValueError("All ArticleBatch columns must have the same length")
+
+    @classmethod
+    def from_models(cls, articles: Iterable[ArticleDetails]) -> 'ArticleBatch':
+        batch = cls()
+        for article in articles:
+            batch.append(article.title, article.content, article.url, article.timestamp)
+        return batch
+
+    def append(self, title: str, content: str, url: str, timestamp: Optional[str] = None) -> None:
+        self.titles.append(title)
+        self.contents.append(content)
+        self.urls.append(url)
+        self.timestamps.append(timestamp)
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def __iter__(self) -> Iterator[ArticleRecord]:
+        return map(ArticleRecord, self.titles, self.contents, self.urls, self.timestamps)
+
+    def to_models(self) -> List[ArticleDetails]:
+        """Build the equivalent ArticleDetails for every row."""
+        return [
+            ArticleDetails(title=title, content=content, url=url, timestamp=timestamp)
+            for title, content, url, timestamp in zip(self.titles, self.contents, self.urls, self.timestamps)
+        ]
+
+    def to_dicts(self) -> List[Dict[str, Optional[str]]]:
+        """Same layout as [article.model_dump() for article in articles]."""
+        return [
+            {'title': title, 'content': content, 'url': url, 'timestamp': timestamp}
+            for title, content, url, timestamp in zip(self.titles, self.contents, self.urls, self.timestamps)
+        ]
@@ -0,0 +1,141 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .dedupe import collapse_near_duplicates
+from .market_watch_sync import MarketWatchScraper
+from .models import ArticleDetails
+from .web_search import web_news_search
+from .yahoo_finance_sync import ScraperConfig, YahooFinanceScraper
+
+
+class AggregatedArticle(ArticleDetails):
+    """A news article tagged with the source it came from."""
+    source: str = Field(..., description="Source the article was retrieved from")
+
+
+class SourceStatus(BaseModel):
+    """Outcome of querying one news source."""
+    status: str = Field(..., description="'ok', 'timeout' or 'error'")
+    articles: int = Field(0, description="Number of articles the source returned")
+    elapsed: Optional[float] = Field(None, description="Seconds the source took, None if it timed out")
+    error: Optional[str] = Field(None, description="Error message if the source failed")
+
+
+class AggregatedNews(BaseModel):
+    """Merged news for a stock symbol across all sources, newest first."""
+    stock_symbol: str
+    articles: List[AggregatedArticle] = Field(default_factory=list)
+    sources: Dict[str, SourceStatus] = Field(default_factory=dict)
+
+    @property
+    def timed_out(self) -> List[str]:
+        return [name for name, status in self.sources.items() if status.status == 'timeout']
+
+
+# Seconds kept back from a source's article deadline to hand its results back within the budget
+COLLECT_MARGIN = 0.1
+
+
+def _scrape_within(scraper, end: float) -> List[ArticleDetails]:
+    """Fetch the listing, then fetch articles until the aggregate budget ends at monotonic time end."""
+    urls = scraper.fetch_article_urls()[:scraper.config.max_articles]
+    # The listing already used part of the budget; articles only get what is left of it
+    scraper.config.deadline = max(0.0, end - time.monotonic() - COLLECT_MARGIN)
+    return scraper.fetch_articles(urls)
+
+
+def _yahoo(stock_symbol: str, max_articles: int, end: float) -> List[ArticleDetails]:
+    config = ScraperConfig(stock_symbol=stock_symbol, max_articles=max_articles)
+    return _scrape_within(YahooFinanceScraper(config), end)
+
+
+def _market_watch(stock_symbol: str, max_articles: int, end: float) -> List[ArticleDetails]:
+    config = ScraperConfig(stock_symbol=stock_symbol, max_articles=max_articles)
+    return _scrape_within(MarketWatchScraper(config), end)
+
+
+def _duckduckgo(stock_symbol: str, max_articles: int, end: float) -> List[ArticleDetails]:
+    results = web_news_search(f"{stock_symbol} stock", max_results=max_articles)
+    return [
+        ArticleDetails(title=r.get('title', ''), content=r.get('body', ''), url=r['url'], timestamp=r.get('date'))
+        for r in results if r.get('url')
+    ]
+
+
+NEWS_SOURCES: Dict[str, Callable[[str, int, float], List[ArticleDetails]]] = {
+    'yahoo': _yahoo,
+    'marketwatch': _market_watch,
+    'duckduckgo': _duckduckgo,
+}
+
+
+def _published_at(article: ArticleDetails) -> datetime:
+    """Parse an article timestamp for ranking; missing or unparsable ones sort last."""
+    try:
+        parsed = datetime.fromisoformat(article.timestamp.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def aggregate_stock_news(stock_symbol: str, budget: float = 3.0, max_articles: int = 10,
+                         sources: Optional[List[str]] = None) -> AggregatedNews:
+    """
+    Query all news sources concurrently and merge whatever finishes within the budget.
+
+    Args:
+        stock_symbol: The stock ticker symbol (e.g., "NVDA").
+        budget: Latency budget in seconds for the whole aggregation.
+        max_articles: Maximum number of articles requested from each source.
+        sources: Names from NEWS_SOURCES to query; defaults to all of them. Each source
+            is called as source(stock_symbol, max_articles, end), where end is the
+            time.monotonic() value at which the budget runs out.
+
+    Returns:
+        AggregatedNews with near-duplicates collapsed, ranked by recency, and
+        the status of every source. Sources that miss the budget are marked
+        'timeout' and keep running in the background without blocking the caller.
+    """
+    stock_symbol = ScraperConfig(stock_symbol=stock_symbol).stock_symbol
+    names = sources or list(NEWS_SOURCES)
+    result = AggregatedNews(stock_symbol=stock_symbol)
+    start = time.monotonic()
+    end = start + budget
+
+    def run(name: str):
+        # Sources get the absolute end of the budget, so time spent on listings counts against it
+        articles = NEWS_SOURCES[name](stock_symbol, max_articles, end)
+        return articles, time.monotonic() - start
+
+    executor = ThreadPoolExecutor(max_workers=len(names))
+    futures = {executor.submit(contextvars.copy_context().run, run, name): name for name in names}
+    try:
+        done, _ = wait(futures, timeout=max(0.0, end - time.monotonic()))
+    finally:
+        # Never wait for slow sources: they finish in the background and are discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    merged: List[AggregatedArticle] = []
+    for future, name in futures.items():
+        if future not in done:
+            result.sources[name] = SourceStatus(status='timeout')
+            continue
+        try:
+            articles, elapsed = future.result()
+        except Exception as e:
+            print(f"Error retrieving {name} news for {stock_symbol}: {e}")
+            result.sources[name] = SourceStatus(status='error', error=str(e))
+            continue
+        result.sources[name] = SourceStatus(status='ok', articles=len(articles), elapsed=elapsed)
+        merged.extend(AggregatedArticle(**article.model_dump(), source=name) for article in articles)
+
+    merged.sort(key=_published_at, reverse=True)
+    result.articles = collapse_near_duplicates(merged)
+    if result.timed_out:
+        print(f"News sources timed out after {budget}s: {', '.join(result.timed_out)}")
+    return result
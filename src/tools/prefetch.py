@@ -0,0 +1,210 @@
+import argparse
+import contextvars
+import heapq
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from .article_store import get_article_store
+from .models import ArticleDetails
+from .rate_limiter import Priority, request_priority
+from .yahoo_finance_sync import ScraperConfig, YahooFinanceScraper
+
+# Warm data older than this is treated as cold by readers
+DEFAULT_MAX_AGE = 900.0
+
+
+class WatchlistEntry(BaseModel):
+    """A ticker kept warm by the prefetch daemon."""
+    stock_symbol: str = Field(..., description="Stock symbol to refresh")
+    interval: Optional[float] = Field(None, description="Refresh interval in seconds; defaults to the daemon's")
+
+    @field_validator('stock_symbol')
+    @classmethod
+    def validate_stock_symbol(cls, v: str) -> str:
+        if not v or not v.strip():
+            raise ValueError("Stock symbol cannot be empty")
+        return v.strip().upper()
+
+
+class PrefetchConfig(BaseModel):
+    """Configuration model for the prefetch daemon."""
+    watchlist: List[WatchlistEntry] = Field(default_factory=list, description="Tickers to keep warm")
+    default_interval: float = Field(300.0, description="Refresh interval in seconds for entries without one")
+    jitter: float = Field(0.1, description="Random fraction of the interval added or removed per refresh")
+    max_concurrency: int = Field(2, description="Maximum number of tickers refreshed at the same time")
+    max_articles: int = Field(10, description="Number of listing articles kept warm per ticker")
+
+
+def warm_articles(stock_symbol: str, max_age: float = DEFAULT_MAX_AGE, n: int = 10) -> Optional[List[ArticleDetails]]:
+    """
+    Return the stored Yahoo articles of a ticker if it was refreshed within max_age seconds.
+
+    Returns None when the data is cold so callers can fall back to a live scrape.
+    """
+    store = get_article_store()
+    refreshed_at = store.last_refreshed(stock_symbol, source='yahoo')
+    if refreshed_at is None or time.time() - refreshed_at > max_age:
+        return None
+    return store.latest(stock_symbol, n=n, source='yahoo')
+
+
+class PrefetchDaemon:
+    """
+    Periodically refreshes the news of a watchlist into the article cache and store.
+
+    Refreshes go through the incremental scraper, so only articles not seen
+    before are downloaded, and run at background priority so they yield to
+    interactive requests in the request scheduler.
+    """
+
+    def __init__(self, config: PrefetchConfig):
+        if config.max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.config = config
+        self.refresh_counts: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._in_flight: set = set()
+
+    def interval(self, entry: WatchlistEntry) -> float:
+        return entry.interval or self.config.default_interval
+
+    def _jittered(self, interval: float) -> float:
+        return max(0.0, interval * (1 + random.uniform(-self.config.jitter, self.config.jitter)))
+
+    def refresh(self, stock_symbol: str) -> int:
+        """Refresh one ticker now and return the number of articles stored."""
+        config = ScraperConfig(stock_symbol=stock_symbol, max_articles=self.config.max_articles)
+        scraper = YahooFinanceScraper(config)
+        with request_priority(Priority.BACKGROUND):
+            articles = scraper.scrape_news_incremental().articles
+        saved = scraper.save_articles(articles) if articles else 0
+        # A failed listing yields no articles and must not mark the ticker as warm
+        if articles:
+            get_article_store().mark_refreshed(config.stock_symbol, source='yahoo')
+        with self._lock:
+            self.refresh_counts[config.stock_symbol] = self.refresh_counts.get(config.stock_symbol, 0) + 1
+        return saved
+
+    def _refresh_in_background(self, stock_symbol: str) -> None:
+        try:
+            self.refresh(stock_symbol)
+        except Exception as e:
+            print(f"Error prefetching news for {stock_symbol}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(stock_symbol)
+
+    def run(self) -> None:
+        """Refresh the watchlist until stop() is called."""
+        entries = {entry.stock_symbol: entry for entry in self.config.watchlist}
+        if not entries:
+            print("Prefetch watchlist is empty")
+            return
+
+        # Stagger the first refreshes so the watchlist does not hit the sites at once
+        now = time.monotonic()
+        schedule = [(now + random.uniform(0, self.config.jitter * self.interval(entry)), symbol)
+                    for symbol, entry in entries.items()]
+        heapq.heapify(schedule)
+        print(f"Prefetching news for {', '.join(entries)}")
+
+        executor = ThreadPoolExecutor(max_workers=self.config.max_concurrency)
+        try:
+            while not self._stop.is_set():
+                due, symbol = schedule[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._stop.wait(delay)
+                    continue
+
+                heapq.heappop(schedule)
+                with self._lock:
+                    # Skip a ticker whose previous refresh is still running
+                    start = symbol not in self._in_flight
+                    self._in_flight.add(symbol)
+                if start:
+                    executor.submit(contextvars.copy_context().run, self._refresh_in_background, symbol)
+                heapq.heappush(schedule, (time.monotonic() + self._jittered(self.interval(entries[symbol])), symbol))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self) -> 'PrefetchDaemon':
+        """Run the daemon in a background thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="news-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_lock = threading.Lock()
+_daemon: Optional[PrefetchDaemon] = None
+
+
+def parse_watchlist(value: str) -> List[WatchlistEntry]:
+    """Parse a watchlist like "NVDA:60,AMD,AAPL:300" where the optional suffix is the interval in seconds."""
+    entries = []
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        symbol, _, interval = item.partition(':')
+        entries.append(WatchlistEntry(stock_symbol=symbol, interval=float(interval) if interval else None))
+    return entries
+
+
+def start_prefetch_from_env() -> Optional[PrefetchDaemon]:
+    """
+    Start the process-wide prefetch daemon for the STOCK_AGENT_WATCHLIST environment variable.
+
+    Safe to call repeatedly; returns None when no watchlist is configured.
+    """
+    global _daemon
+    watchlist = os.getenv('STOCK_AGENT_WATCHLIST')
+    if not watchlist:
+        return None
+    with _lock:
+        if _daemon is None:
+            config = PrefetchConfig(watchlist=parse_watchlist(watchlist))
+            if interval := os.getenv('STOCK_AGENT_PREFETCH_INTERVAL'):
+                config.default_interval = float(interval)
+            _daemon = PrefetchDaemon(config).start()
+        return _daemon
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Keep news for a watchlist of tickers warm in the local store.")
+    parser.add_argument("watchlist", help='Comma separated tickers with optional intervals, e.g. "NVDA:60,AMD"')
+    parser.add_argument("--interval", type=float, default=300.0, help="Default refresh interval in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Random fraction of the interval per refresh")
+    parser.add_argument("--concurrency", type=int, default=2, help="Maximum tickers refreshed at once")
+    parser.add_argument("--max-articles", type=int, default=10, help="Articles kept warm per ticker")
+    args = parser.parse_args(argv)
+
+    daemon = PrefetchDaemon(PrefetchConfig(
+        watchlist=parse_watchlist(args.watchlist),
+        default_interval=args.interval,
+        jitter=args.jitter,
+        max_concurrency=args.concurrency,
+        max_articles=args.max_articles,
+    ))
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel, Field
+
+
+class Priority(IntEnum):
+    """Request priority; lower values are served first."""
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    'request_priority', default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """Run the enclosed requests at the given priority, e.g. Priority.BACKGROUND for polling."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+class DomainLimit(BaseModel):
+    """Token bucket settings for one domain."""
+    rate: float = Field(5.0, description="Sustained requests per second")
+    burst: int = Field(10, description="Maximum number of requests issued back to back")
+
+
+class SchedulerConfig(BaseModel):
+    """Configuration model for the request scheduler."""
+    default_limit: DomainLimit = Field(default_factory=DomainLimit, description="Limit for unlisted domains")
+    domain_limits: Dict[str, DomainLimit] = Field(
+        default_factory=lambda: {
+            "finance.yahoo.com": DomainLimit(rate=5.0, burst=10),
+            "www.marketwatch.com": DomainLimit(rate=2.0, burst=4),
+        },
+        description="Per-domain limits"
+    )
+    backoff_base: float = Field(2.0, description="First backoff in seconds after a 429 without Retry-After")
+    max_backoff: float = Field(120.0, description="Upper bound for any backoff in seconds")
+    min_rate_fraction: float = Field(0.1, description="Lowest fraction of the configured rate after repeated 429s")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _DomainState:
+    def __init__(self, limit: DomainLimit):
+        self.limit = limit
+        self.rate = limit.rate
+        self.tokens = float(limit.burst)
+        self.refilled_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+        self.waiters: List[Tuple[int, int]] = []
+        self.requests = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_queue_depth = 0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.limit.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+
+class RequestScheduler:
+    """
+    Shared per-domain token bucket scheduler with priority queueing.
+
+    Requests to the same domain are released in priority order, then FIFO.
+    A 429 response blocks the domain for its Retry-After (or an exponential
+    backoff) and halves the domain's rate; successes restore the rate
+    gradually (additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, config: Optional[SchedulerConfig] = None):
+        self.config = config or SchedulerConfig()
+        self._cond = threading.Condition()
+        self._domains: Dict[str, _DomainState] = {}
+        self._sequence = itertools.count()
+
+    def _state(self, domain: str) -> _DomainState:
+        state = self._domains.get(domain)
+        if state is None:
+            limit = self.config.domain_limits.get(domain, self.config.default_limit)
+            state = self._domains[domain] = _DomainState(limit)
+        return state
+
+    def acquire(self, url: str, priority: Optional[Priority] = None, timeout: Optional[float] = None) -> float:
+        """
+        Block until a request to the URL's domain may be sent and return the time waited.
+
+        Raises:
+            TimeoutError: If no slot became available within timeout seconds.
+        """
+        domain = urlsplit(url).netloc.lower()
+        priority = current_priority() if priority is None else priority
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+
+        with self._cond:
+            state = self._state(domain)
+            entry = (int(priority), next(self._sequence))
+            heapq.heappush(state.waiters, entry)
+            state.max_queue_depth = max(state.max_queue_depth, len(state.waiters))
+            try:
+                while True:
+                    now = time.monotonic()
+                    state.refill(now)
+                    is_next = state.waiters[0] == entry
+                    if is_next and now >= state.blocked_until and state.tokens >= 1:
+                        state.tokens -= 1
+                        heapq.heappop(state.waiters)
+                        break
+                    if deadline is not None and now >= deadline:
+                        state.waiters.remove(entry)
+                        heapq.heapify(state.waiters)
+                        raise TimeoutError(f"Timed out waiting for a request slot for {domain}")
+                    # The head of the queue sleeps until it can go; everyone else waits to be notified
+                    wait = None
+                    if is_next:
+                        wait = max(state.blocked_until - now, (1 - state.tokens) / state.rate)
+                    if deadline is not None:
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    self._cond.wait(wait)
+            finally:
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            state.requests += 1
+            state.total_wait += waited
+            state.max_wait = max(state.max_wait, waited)
+            return waited
+
+    def record_response(self, url: str, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Adapt the domain's rate to a response status, honoring Retry-After on 429."""
+        domain = urlsplit(url).netloc.lower()
+        with self._cond:
+            state = self._state(domain)
+            if status_code == 429:
+                state.throttled += 1
+                state.backoff = min(self.config.max_backoff, state.backoff * 2 or self.config.backoff_base)
+                delay = parse_retry_after(retry_after)
+                delay = min(self.config.max_backoff, delay if delay is not None else state.backoff)
+                state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+                state.rate = max(state.limit.rate * self.config.min_rate_fraction, state.rate / 2)
+                state.tokens = min(state.tokens, 0.0)
+                print(f"Rate limited by {domain}, backing off {delay:.1f}s at {state.rate:.2f} req/s")
+            elif status_code < 400:
+                state.backoff = 0.0
+                state.rate = min(state.limit.rate, state.rate + state.limit.rate * 0.1)
+            self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Return queue depth, wait time and throttling statistics per domain."""
+        with self._cond:
+            return {
+                domain: {
+                    'queue_depth': len(state.waiters),
+                    'max_queue_depth': state.max_queue_depth,
+                    'requests': state.requests,
+                    'throttled': state.throttled,
+                    'avg_wait': state.total_wait / state.requests if state.requests else 0.0,
+                    'max_wait': state.max_wait,
+                    'rate': state.rate,
+                }
+                for domain, state in self._domains.items()
+            }
+
+
+_lock = threading.Lock()
+_scheduler: Optional[RequestScheduler] = None
+
+
+def configure_scheduler(config: SchedulerConfig) -> RequestScheduler:
+    """Replace the process-wide request scheduler."""
+    global _scheduler
+    with _lock:
+        _scheduler = RequestScheduler(config)
+        return _scheduler
+
+
+def get_scheduler() -> RequestScheduler:
+    """Return the process-wide request scheduler, creating it on first use."""
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
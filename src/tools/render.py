@@ -0,0 +1,155 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .context_manager import Tokenizer, estimate_tokens
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+class RenderConfig(BaseModel):
+    """Configuration model for rendering tool outputs into tool messages."""
+    format: str = Field('text', description="'text' for a compact plain-text layout or 'json'")
+    max_tokens: int = Field(3000, description="Token budget for the whole tool message")
+    lead_sentences: Optional[int] = Field(
+        4, description="Keep only the first sentences of each article; None keeps the full content"
+    )
+    max_article_chars: Optional[int] = Field(800, description="Hard cap on the content characters per article")
+
+
+def _article_fields(article: Any) -> Dict[str, Any]:
+    data = dict(article) if isinstance(article, dict) else article.model_dump()
+    content = data.get('content') or ''
+    if isinstance(content, list):
+        content = ' '.join(content)
+    return {
+        'title': data.get('title') or '',
+        'source': data.get('source'),
+        'timestamp': data.get('timestamp'),
+        'url': str(data.get('url') or ''),
+        'content': re.sub(r'\s+', ' ', content).strip(),
+    }
+
+
+def is_article(value: Any) -> bool:
+    if isinstance(value, dict):
+        return 'url' in value and 'title' in value
+    return hasattr(value, 'url') and hasattr(value, 'title') and hasattr(value, 'model_dump')
+
+
+def lead(text: str, sentences: Optional[int]) -> str:
+    """Return the first sentences of the text, where news articles put their key points."""
+    if not sentences:
+        return text
+    return ' '.join(_SENTENCE_END.split(text, maxsplit=sentences)[:sentences])
+
+
+def _clip(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 1:
+        return ''
+    return text[:max_chars - 1].rsplit(' ', 1)[0] + '…'
+
+
+class ArticleRenderer:
+    """
+    Renders scraper results compactly for the model.
+
+    Only what the summary guidelines need is kept: title, source, timestamp,
+    URL and the lead of the content. When the articles do not fit the token
+    budget, every article's content is shortened evenly, and articles that do
+    not fit even without content are left out with a note.
+    """
+
+    def __init__(self, config: Optional[RenderConfig] = None, tokenizer: Optional[Tokenizer] = None):
+        self.config = config or RenderConfig()
+        self.tokenizer = tokenizer or estimate_tokens
+
+    def _render_one(self, index: int, article: Dict[str, Any]) -> str:
+        if self.config.format == 'json':
+            return json.dumps({k: v for k, v in article.items() if v}, ensure_ascii=False, separators=(',', ':'))
+        meta = ' | '.join(str(value) for value in (article['source'], article['timestamp']) if value)
+        lines = [f"[{index}] {article['title']}"]
+        if meta:
+            lines.append(meta)
+        lines.append(article['url'])
+        if article['content']:
+            lines.append(article['content'])
+        return '\n'.join(lines)
+
+    def _join(self, parts: List[str]) -> str:
+        if self.config.format == 'json':
+            return '[' + ','.join(parts) + ']'
+        return '\n\n'.join(parts)
+
+    def render_articles(self, articles: List[Any], max_tokens: Optional[int] = None) -> str:
+        """Render a list of articles within max_tokens (defaults to the configured budget)."""
+        max_tokens = max_tokens or self.config.max_tokens
+        fields = [_article_fields(article) for article in articles]
+        for article in fields:
+            article['content'] = lead(article['content'], self.config.lead_sentences)
+            if self.config.max_article_chars is not None:
+                article['content'] = _clip(article['content'], self.config.max_article_chars)
+
+        # Keep as many articles as fit without content, leaving room for the note on omitted ones
+        bare = [self._render_one(i, {**article, 'content': ''}) for i, article in enumerate(fields, 1)]
+        kept = len(fields)
+        while kept and self.tokenizer(self._join(bare[:kept])) > max_tokens - 20:
+            kept -= 1
+        fields = fields[:kept]
+        budget = max_tokens - 20 if kept < len(articles) else max_tokens
+
+        # Binary search for the largest uniform content cap that fits the budget
+        low, high = 0, max((len(article['content']) for article in fields), default=0)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.tokenizer(self._render_capped(fields, mid)) <= budget:
+                low = mid
+            else:
+                high = mid - 1
+
+        text = self._render_capped(fields, low)
+        if kept < len(articles):
+            text += f"\n({len(articles) - kept} more articles omitted)"
+        return text
+
+    def _render_capped(self, fields: List[Dict[str, Any]], cap: int) -> str:
+        return self._join([
+            self._render_one(i, {**article, 'content': _clip(article['content'], cap)})
+            for i, article in enumerate(fields, 1)
+        ])
+
+    def render(self, output: Any) -> str:
+        """Render any tool output: article lists, per-ticker dicts, aggregated news or plain values."""
+        if isinstance(output, list) and output and all(is_article(item) for item in output):
+            return self.render_articles(output)
+        if isinstance(output, dict) and isinstance(output.get('articles'), list):
+            extra = {k: v for k, v in output.items() if k != 'articles' and v}
+            text = self.render_articles(output['articles'], self.config.max_tokens - self.tokenizer(str(extra)))
+            notes = '\n'.join(f"{k}: {v}" for k, v in extra.items())
+            return f"{text}\n{notes}" if notes else text
+        if isinstance(output, dict) and output and all(isinstance(v, list) for v in output.values()):
+            # Per-ticker results share the budget evenly
+            share = self.config.max_tokens // len(output)
+            sections = [
+                f"## {key}\n{self.render_articles(value, share) if value else 'No articles found'}"
+                for key, value in output.items()
+            ]
+            return '\n\n'.join(sections)
+        if isinstance(output, list) and not output:
+            return "No articles found"
+        text = output if isinstance(output, str) else str(output)
+        # Other outputs (errors, transcripts) are clipped at about four characters per token
+        return _clip(text, self.config.max_tokens * 4)
+
+
+_default_renderer = ArticleRenderer()
+
+
+def render_tool_output(output: Any, config: Optional[RenderConfig] = None) -> str:
+    """Render a tool output as a compact tool message."""
+    renderer = ArticleRenderer(config) if config else _default_renderer
+    return renderer.render(output)
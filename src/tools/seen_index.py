@@ -0,0 +1,59 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .article_cache import default_data_dir, normalize_url
+
+
+class SeenIndex:
+    """Persisted per-ticker index of article URLs already scraped, with their publication timestamps."""
+
+    def __init__(self, stock_symbol: str, data_dir: Optional[str] = None, max_entries: int = 1000):
+        self.stock_symbol = stock_symbol
+        self.max_entries = max_entries
+        index_dir = os.path.join(data_dir or default_data_dir(), 'seen')
+        os.makedirs(index_dir, exist_ok=True)
+        self.path = os.path.join(index_dir, f"{stock_symbol}_seen_urls.json")
+        self.entries: Dict[str, Dict[str, Optional[str]]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Optional[str]]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Error loading seen index {self.path}, starting fresh: {e}")
+            return {}
+
+    def __contains__(self, url: str) -> bool:
+        return normalize_url(url) in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, url: str, timestamp: Optional[str]) -> None:
+        """Record an article URL with its publication timestamp."""
+        self.entries[normalize_url(url)] = {
+            'url': url,
+            'timestamp': timestamp,
+            'seen_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        }
+
+    def latest_urls(self) -> List[str]:
+        """Return the original article URLs, most recently published first."""
+        ordered = sorted(self.entries.values(), key=lambda e: e['timestamp'] or e['seen_at'], reverse=True)
+        return [entry['url'] for entry in ordered]
+
+    def save(self) -> None:
+        """Write the index atomically, keeping only the most recent entries."""
+        if len(self.entries) > self.max_entries:
+            keep = {normalize_url(url) for url in self.latest_urls()[:self.max_entries]}
+            self.entries = {key: entry for key, entry in self.entries.items() if key in keep}
+
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
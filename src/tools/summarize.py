@@ -0,0 +1,211 @@
+import contextvars
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from .model_warmup import DEFAULT_KEEP_ALIVE
+from .render import lead
+from .tracing import span
+
+MAP_PROMPT = """Condense this news article about {stock} into at most {words} words.
+Keep concrete facts: figures, guidance, deals, products, people and dates. No preamble.
+
+Title: {title}
+Published: {timestamp}
+
+{content}"""
+
+REDUCE_PROMPT = """Below are digests of {count} news articles about {stock} from {source}.
+
+{digests}
+
+Summary Guidelines:
+1. Provide a concise overview of the key news for {stock}.
+2. Highlight the most significant information from each article.
+3. For each article give its title, key points, URL and timestamp.
+4. Focus on factual information and recent developments.
+5. State that the news is sourced from {source} and how many articles you summarized ({count}).
+
+Output Structure:
+- **Overview**: A brief summary of all articles.
+- **Detailed Summaries**: Title, key points, URL and timestamp of each article."""
+
+
+class SummarizeConfig(BaseModel):
+    """Configuration model for map-reduce summarization of news articles."""
+    map_model: str = Field(
+        default_factory=lambda: os.getenv('STOCK_AGENT_MAP_MODEL', 'llama3.2'),
+        description="Small model that condenses each article"
+    )
+    reduce_model: str = Field(
+        default_factory=lambda: os.getenv('STOCK_AGENT_REDUCE_MODEL', 'llama3.2'),
+        description="Model that merges the article digests into the final summary"
+    )
+    max_concurrency: int = Field(
+        default_factory=lambda: int(os.getenv('STOCK_AGENT_SUMMARY_CONCURRENCY', '4')),
+        ge=1, description="Maximum number of map requests in flight to Ollama"
+    )
+    digest_words: int = Field(80, ge=10, description="Target length of each article digest")
+    max_article_chars: int = Field(6000, ge=200, description="Article content beyond this is cut before the map call")
+    map_num_ctx: int = Field(4096, description="Context window of the map requests")
+    reduce_num_ctx: int = Field(8192, description="Context window of the reduce request")
+    source: str = Field("Yahoo Finance", description="News source named in the summary")
+
+
+def _field(article: Any, name: str) -> str:
+    value = article.get(name) if isinstance(article, dict) else getattr(article, name, None)
+    return str(value) if value is not None else ''
+
+
+def digest_key(model: str, article: Any) -> str:
+    """Key an article digest by the map model and a hash of the article title and content."""
+    text = f"{model}\0{_field(article, 'title')}\0{_field(article, 'content')}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class DigestCache:
+    """Thread-safe LRU cache of article digests keyed by content hash."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            digest = self._entries.get(key)
+            if digest is not None:
+                self._entries.move_to_end(key)
+            return digest
+
+    def put(self, key: str, digest: str) -> None:
+        with self._lock:
+            self._entries[key] = digest
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class MapReduceSummarizer:
+    """
+    Summarizes many articles without stuffing them all into one prompt.
+
+    Map: each article is condensed by the map model, with at most max_concurrency
+    requests in flight. Reduce: the digests are merged by the reduce model in one call.
+    Digests are cached by content hash, so re-summarizing a listing only maps new articles.
+    """
+
+    def __init__(self, config: Optional[SummarizeConfig] = None, client: Any = None,
+                 cache: Optional[DigestCache] = None):
+        self.config = config or SummarizeConfig()
+        if client is None:
+            import ollama
+            client = ollama.Client()
+        self.client = client
+        self.cache = cache if cache is not None else get_digest_cache()
+
+    def digest(self, stock: str, article: Any) -> str:
+        """Condense one article, reusing the cached digest of identical content."""
+        key = digest_key(self.config.map_model, article)
+        with span('summarize.map', model=self.config.map_model, url=_field(article, 'url')) as s:
+            if (cached := self.cache.get(key)) is not None:
+                s.set(cache='hit')
+                return cached
+            s.set(cache='miss')
+            prompt = MAP_PROMPT.format(
+                stock=stock,
+                words=self.config.digest_words,
+                title=_field(article, 'title'),
+                timestamp=_field(article, 'timestamp') or 'unknown',
+                content=_field(article, 'content')[:self.config.max_article_chars],
+            )
+            response = self.client.chat(
+                self.config.map_model,
+                messages=[{'role': 'user', 'content': prompt}],
+                options={'num_ctx': self.config.map_num_ctx, 'num_predict': self.config.digest_words * 2},
+                keep_alive=DEFAULT_KEEP_ALIVE,
+            )
+            digest = response.message.content.strip()
+            if digest:
+                self.cache.put(key, digest)
+            return digest
+
+    def map(self, stock: str, articles: Sequence[Any]) -> List[str]:
+        """Digest all articles concurrently and return the digests in article order."""
+        if not articles:
+            return []
+
+        def run(article: Any) -> str:
+            try:
+                return self.digest(stock, article)
+            except Exception as e:
+                # One failed map call should not sink the summary; fall back to the article lead
+                print(f"Error digesting {_field(article, 'url')}: {e}")
+                return lead(_field(article, 'content'), 3)
+
+        workers = min(self.config.max_concurrency, len(articles))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Workers run in the caller's context so map spans nest under the current span
+            futures = [executor.submit(contextvars.copy_context().run, run, article) for article in articles]
+            return [future.result() for future in futures]
+
+    def reduce(self, stock: str, articles: Sequence[Any], digests: Sequence[str],
+               user_input: Optional[str] = None) -> str:
+        """Merge the article digests into the final summary."""
+        entries = [
+            f"[{index}] {_field(article, 'title')}\nURL: {_field(article, 'url')}\n"
+            f"Timestamp: {_field(article, 'timestamp') or 'unknown'}\n{digest}"
+            for index, (article, digest) in enumerate(zip(articles, digests), start=1)
+        ]
+        prompt = REDUCE_PROMPT.format(
+            count=len(entries), stock=stock, source=self.config.source, digests='\n\n'.join(entries)
+        )
+        messages = [
+            {'role': 'system', 'content': f"You are a professional financial news summarizer. "
+                                          f"Provide a clear, informative summary of {stock} stock news."},
+            {'role': 'user', 'content': prompt},
+        ]
+        if user_input:
+            messages.append({'role': 'user', 'content': user_input})
+        with span('summarize.reduce', model=self.config.reduce_model, articles=len(entries)):
+            response = self.client.chat(
+                self.config.reduce_model,
+                messages=messages,
+                options={'num_ctx': self.config.reduce_num_ctx},
+                keep_alive=DEFAULT_KEEP_ALIVE,
+            )
+        return response.message.content
+
+    def summarize(self, stock: str, articles: Sequence[Any], user_input: Optional[str] = None) -> str:
+        """Map every article to a digest, then reduce the digests to one summary."""
+        if not articles:
+            return f"No recent news articles found for {stock}."
+        return self.reduce(stock, articles, self.map(stock, articles), user_input)
+
+
+_lock = threading.Lock()
+_digest_cache: Optional[DigestCache] = None
+
+
+def get_digest_cache() -> DigestCache:
+    """Return the process-wide digest cache, creating it on first use."""
+    global _digest_cache
+    with _lock:
+        if _digest_cache is None:
+            _digest_cache = DigestCache()
+        return _digest_cache
+
+
+def summarize_articles(stock: str, articles: Sequence[Any], user_input: Optional[str] = None,
+                       config: Optional[SummarizeConfig] = None) -> str:
+    """Summarize scraped articles with the map-reduce pipeline."""
+    return MapReduceSummarizer(config).summarize(stock, articles, user_input)
@@ -0,0 +1,129 @@
+import re
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .tool_cache import Speculation, ToolCache, cache_key, get_tool_cache
+
+# Widely followed symbols and the names people use for them
+KNOWN_TICKERS: Dict[str, List[str]] = {
+    'AAPL': ['apple'],
+    'ADBE': ['adobe'],
+    'AMD': ['advanced micro devices'],
+    'AMZN': ['amazon'],
+    'ARM': ['arm holdings'],
+    'AVGO': ['broadcom'],
+    'BA': ['boeing'],
+    'BAC': ['bank of america'],
+    'BRK-B': ['berkshire hathaway', 'berkshire'],
+    'COST': ['costco'],
+    'CRM': ['salesforce'],
+    'CSCO': ['cisco'],
+    'DIS': ['disney'],
+    'GOOGL': ['alphabet', 'google'],
+    'GS': ['goldman sachs'],
+    'IBM': [],
+    'INTC': ['intel'],
+    'JNJ': ['johnson & johnson', 'johnson and johnson'],
+    'JPM': ['jpmorgan', 'jp morgan'],
+    'KO': ['coca-cola', 'coca cola'],
+    'MA': ['mastercard'],
+    'META': ['facebook'],
+    'MSFT': ['microsoft'],
+    'MU': ['micron'],
+    'NFLX': ['netflix'],
+    'NKE': ['nike'],
+    'NVDA': ['nvidia'],
+    'ORCL': ['oracle'],
+    'PEP': ['pepsico', 'pepsi'],
+    'PFE': ['pfizer'],
+    'PLTR': ['palantir'],
+    'QCOM': ['qualcomm'],
+    'SMCI': ['supermicro', 'super micro'],
+    'TSLA': ['tesla'],
+    'TSM': ['tsmc', 'taiwan semiconductor'],
+    'UBER': [],
+    'V': ['visa'],
+    'WMT': ['walmart'],
+    'XOM': ['exxon', 'exxonmobil', 'exxon mobil'],
+}
+
+# Short symbols that are also common words only match as cashtags, e.g. "$MA"
+_AMBIGUOUS = {'A', 'I', 'IT', 'MA', 'ON', 'V'}
+
+_CASHTAG = re.compile(r'\$([A-Za-z]{1,5}(?:[.-][A-Za-z])?)\b')
+_UPPER_TOKEN = re.compile(r'\b[A-Z]{1,5}(?:-[A-Z])?\b')
+
+
+class TickerMatcher:
+    """
+    Fast local matcher for ticker symbols mentioned in a message.
+
+    Recognizes cashtags ("$NVDA"), known symbols written in capitals ("NVDA")
+    and company names ("Nvidia"), in the order they appear.
+    """
+
+    def __init__(self, tickers: Optional[Dict[str, List[str]]] = None):
+        tickers = tickers if tickers is not None else KNOWN_TICKERS
+        self.symbols = set(tickers)
+        names = {name: symbol for symbol, aliases in tickers.items() for name in aliases}
+        # Longest names first so "bank of america" wins over shorter overlapping names
+        pattern = '|'.join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+        self._names = names
+        self._name_pattern = re.compile(rf'\b(?:{pattern})\b', re.IGNORECASE) if pattern else None
+
+    def find(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """Return the distinct symbols mentioned in the text in order of appearance."""
+        matches: List[Tuple[int, str]] = [(m.start(), m.group(1).upper()) for m in _CASHTAG.finditer(text)]
+        matches += [
+            (m.start(), m.group())
+            for m in _UPPER_TOKEN.finditer(text)
+            if m.group() in self.symbols and m.group() not in _AMBIGUOUS
+        ]
+        if self._name_pattern is not None:
+            matches += [(m.start(), self._names[m.group().lower()]) for m in self._name_pattern.finditer(text)]
+
+        symbols = list(dict.fromkeys(symbol for _, symbol in sorted(matches)))
+        return symbols[:limit] if limit is not None else symbols
+
+
+_default_matcher = TickerMatcher()
+
+
+def find_tickers(text: str, limit: Optional[int] = None) -> List[str]:
+    """Return the ticker symbols mentioned in the text using the built-in symbol table."""
+    return _default_matcher.find(text, limit)
+
+
+def speculate_tickers(text: str, tool_name: str, function: Callable[..., object], executor: Executor,
+                      argument: str = 'stock', limit: int = 2,
+                      cache: Optional[ToolCache] = None) -> Dict[Tuple[str, str], Speculation]:
+    """
+    Start the tool in the background for each ticker mentioned in the text.
+
+    Speculative runs go through the tool cache, so a matching tool call made
+    by the model afterwards joins the in-flight run instead of starting over.
+    Use an executor of their own, so unused runs never hold workers the
+    model's real tool calls need. Returns the started runs keyed by their tool cache key.
+    """
+    cache = cache if cache is not None else get_tool_cache()
+    speculations = {}
+    for symbol in find_tickers(text, limit):
+        arguments = {argument: symbol}
+        if future := cache.speculate(tool_name, arguments, function, executor):
+            print(f"Speculatively running {tool_name} for {symbol}")
+            speculations[cache_key(tool_name, arguments)] = future
+    return speculations
+
+
+def cancel_unused(speculations: Dict[Tuple[str, str], Speculation], tool_calls: Optional[Iterable]) -> int:
+    """
+    Cancel speculative runs the model did not ask for and return how many were dropped.
+
+    Queued runs never start; running ones stop at their next stop_requested() check.
+    """
+    requested = {cache_key(call.function.name, call.function.arguments) for call in tool_calls or []}
+    cancelled = 0
+    for key, speculation in speculations.items():
+        if key not in requested and speculation.cancel():
+            cancelled += 1
+    return cancelled
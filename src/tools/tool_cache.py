@@ -0,0 +1,271 @@
+import asyncio
+import contextvars
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Executor, Future
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .tracing import current_span
+
+# Arguments holding ticker symbols; "nvda" and "NVDA " are the same request
+SYMBOL_ARGUMENTS = {'stock', 'stocks', 'symbol', 'ticker', 'stock_symbol'}
+
+
+class ToolCacheConfig(BaseModel):
+    """Configuration model for the tool result cache."""
+    max_entries: int = Field(256, description="Maximum number of cached tool results")
+    default_ttl: float = Field(300.0, description="Seconds a tool result stays fresh")
+    ttls: Dict[str, float] = Field(
+        default_factory=lambda: {'speech_to_text': 86400.0},
+        description="Per-tool TTL overrides in seconds; 0 disables caching but keeps coalescing"
+    )
+
+
+def _normalize(name: str, value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        return value.upper() if name in SYMBOL_ARGUMENTS else value
+    if isinstance(value, (list, tuple)):
+        return [_normalize(name, item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(key, item) for key, item in value.items()}
+    return value
+
+
+def cache_key(tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+    """Key a tool call by its name and normalized arguments."""
+    normalized = {name: _normalize(name, value) for name, value in (arguments or {}).items()}
+    return tool_name, json.dumps(normalized, sort_keys=True, default=str)
+
+
+# Stop event of the speculative run executing in the current context, if any
+_stop_event: ContextVar[Optional[threading.Event]] = ContextVar('speculation_stop', default=None)
+
+
+def stop_requested() -> bool:
+    """
+    Return True when the speculative run calling this has been cancelled.
+
+    Long-running tools check this between units of work (e.g. articles) and
+    return early; outside a speculative run it is always False.
+    """
+    event = _stop_event.get()
+    return event is not None and event.is_set()
+
+
+class Speculation:
+    """
+    Handle of a background tool run started by ToolCache.speculate.
+
+    Cancelling drops the run if it is still queued; a run that already started
+    is asked to stop at its next stop_requested() check, and its in-flight
+    slot is released at once so later identical calls start a fresh run.
+    """
+
+    def __init__(self, cache: 'ToolCache', key: Tuple[str, str], shared: Future, task: Future,
+                 stop: threading.Event):
+        self._cache = cache
+        self._key = key
+        self._shared = shared
+        self.task = task
+        self.stop = stop
+
+    def cancel(self) -> bool:
+        """Cancel or stop the run; return False if it had already finished."""
+        if self.task.done():
+            return False
+        self.stop.set()
+        if not self.task.cancel():
+            self._cache._release(self._key, self._shared)
+        return True
+
+    def cancelled(self) -> bool:
+        return self.stop.is_set()
+
+    def done(self) -> bool:
+        return self.task.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return self.task.result(timeout)
+
+
+def is_cacheable(result: Any) -> bool:
+    """
+    Tools report failures as None or an error message; those are never cached.
+
+    Neither are empty results: scrapers return [] when a listing fails to load,
+    and a transient failure must not hide the news for a whole TTL.
+    """
+    if result is None:
+        return False
+    if isinstance(result, (list, tuple, dict, str)) and not result:
+        return False
+    return not (isinstance(result, str) and result.startswith('Error'))
+
+
+class ToolCache:
+    """
+    Thread-safe TTL and LRU cache of tool results with single-flight coalescing.
+
+    Concurrent identical calls, from threads or from event loops in different
+    threads, share one in-flight execution through a concurrent.futures.Future.
+    """
+
+    def __init__(self, config: Optional[ToolCacheConfig] = None):
+        self.config = config or ToolCacheConfig()
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, Any]]' = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def ttl(self, tool_name: str) -> float:
+        return self.config.ttls.get(tool_name, self.config.default_ttl)
+
+    def _begin(self, key: Tuple[str, str]) -> Tuple[str, Any]:
+        """
+        Return ('hit', result) for a fresh entry, ('wait', future) when an identical
+        call is in flight, or ('run', future) when the caller must run the tool.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return 'hit', result
+                del self._entries[key]
+            if key in self._in_flight:
+                self.coalesced += 1
+                return 'wait', self._in_flight[key]
+            self.misses += 1
+            future: Future = Future()
+            self._in_flight[key] = future
+            return 'run', future
+
+    def _finish(self, key: Tuple[str, str], future: Future, result: Any) -> None:
+        ttl = self.ttl(key[0])
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if ttl > 0 and is_cacheable(result):
+                self._entries[key] = (time.monotonic() + ttl, result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.config.max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result(result)
+
+    def _fail(self, key: Tuple[str, str], future: Future, error: BaseException) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # Cancelled or interrupted owner: waiters are cancelled too instead of hanging
+            future.cancel()
+
+    def _release(self, key: Tuple[str, str], future: Future) -> None:
+        """Stop new calls from joining an in-flight run that was asked to stop."""
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _run(self, key: Tuple[str, str], future: Future, function: Callable[..., Any],
+             arguments: Dict[str, Any]) -> Any:
+        try:
+            result = function(**arguments)
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        if stop_requested():
+            # A stopped run may be partial: hand it to callers that already joined, but never cache it
+            self._release(key, future)
+            future.set_result(result)
+        else:
+            self._finish(key, future, result)
+        return result
+
+    def call(self, tool_name: str, arguments: Dict[str, Any], function: Callable[..., Any]) -> Any:
+        """Return the cached result of function(**arguments), running it at most once at a time."""
+        key = cache_key(tool_name, arguments)
+        state, value = self._begin(key)
+        current_span().set(cache=state)
+        if state == 'hit':
+            return value
+        if state == 'wait':
+            return value.result()
+        return self._run(key, value, function, arguments)
+
+    async def acall(self, tool_name: str, arguments: Dict[str, Any], function: Callable[..., Awaitable[Any]]) -> Any:
+        """Async variant of call for coroutine tools."""
+        key = cache_key(tool_name, arguments)
+        state, value = self._begin(key)
+        current_span().set(cache=state)
+        if state == 'hit':
+            return value
+        if state == 'wait':
+            return await asyncio.wrap_future(value)
+        try:
+            result = await function(**arguments)
+        except BaseException as e:
+            self._fail(key, value, e)
+            raise
+        self._finish(key, value, result)
+        return result
+
+    def speculate(self, tool_name: str, arguments: Dict[str, Any], function: Callable[..., Any],
+                  executor: Executor) -> Optional[Speculation]:
+        """
+        Run the call in the background unless its result is already cached or in flight.
+
+        The call counts as in flight from the moment it is queued, so an identical
+        call made later waits for it. Returns a Speculation handle; the function
+        can poll stop_requested() to return early once the handle is cancelled.
+        """
+        key = cache_key(tool_name, arguments)
+        state, value = self._begin(key)
+        if state != 'run':
+            return None
+        stop = threading.Event()
+        context = contextvars.copy_context()
+        context.run(_stop_event.set, stop)
+        task = executor.submit(context.run, self._run, key, value, function, arguments)
+        task.add_done_callback(lambda task: task.cancelled() and self._fail(key, value, CancelledError()))
+        return Speculation(self, key, value, task, stop)
+
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        """Drop cached results of one tool, or of all tools."""
+        with self._lock:
+            for key in [key for key in self._entries if tool_name is None or key[0] == tool_name]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_lock = threading.Lock()
+_cache: Optional[ToolCache] = None
+
+
+def configure_tool_cache(config: Optional[ToolCacheConfig] = None) -> ToolCache:
+    """Replace the process-wide tool cache."""
+    global _cache
+    with _lock:
+        _cache = ToolCache(config)
+        return _cache
+
+
+def get_tool_cache() -> ToolCache:
+    """Return the process-wide tool cache, creating it on first use."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = ToolCache()
+        return _cache
@@ -0,0 +1,199 @@
+import atexit
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Span:
+    """A timed operation with attributes, nested under the span active when it started."""
+    __slots__ = ('name', 'attributes', 'span_id', 'parent_id', 'thread_id', 'start_ns', 'end_ns', '_token')
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.span_id = next(_ids)
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.thread_id = threading.get_ident()
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token = None
+
+    def set(self, **attributes: Any) -> 'Span':
+        self.attributes.update(attributes)
+        return self
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self) -> 'Span':
+        self._token = _current_span.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attributes['error'] = repr(exc)
+        _current_span.reset(self._token)
+        _tracer.record(self)
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled; every operation is a no-op."""
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> '_NoopSpan':
+        return self
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+_ids = itertools.count(1)
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+class Tracer:
+    """Collects finished spans in memory and exports them as JSON lines or a Chrome trace."""
+
+    def __init__(self, enabled: bool = False, max_spans: int = 100000):
+        self.enabled = enabled
+        self.origin_ns = time.perf_counter_ns()
+        self.origin_epoch = time.time()
+        self._lock = threading.Lock()
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return [{
+            'name': span.name,
+            'span_id': span.span_id,
+            'parent_id': span.parent_id,
+            'thread_id': span.thread_id,
+            'start': self.origin_epoch + (span.start_ns - self.origin_ns) / 1e9,
+            'duration_ms': span.duration_ms,
+            'attributes': span.attributes,
+        } for span in self.spans()]
+
+    def export_jsonl(self, path: str) -> int:
+        """Write one JSON object per span and return the number of spans written."""
+        records = self.to_records()
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + '\n')
+        return len(records)
+
+    def export_chrome(self, path: str) -> int:
+        """Write spans in the Chrome trace event format, viewable in Perfetto or chrome://tracing."""
+        pid = os.getpid()
+        events = [{
+            'name': span.name,
+            'ph': 'X',
+            'ts': (span.start_ns - self.origin_ns) / 1e3,
+            'dur': (span.end_ns - span.start_ns) / 1e3,
+            'pid': pid,
+            'tid': span.thread_id,
+            'args': {**span.attributes, 'span_id': span.span_id, 'parent_id': span.parent_id},
+        } for span in self.spans()]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+        return len(events)
+
+    def export(self, path: str) -> int:
+        """Export to a .jsonl file as JSON lines, or to any other path as a Chrome trace."""
+        if path.endswith('.jsonl'):
+            return self.export_jsonl(path)
+        return self.export_chrome(path)
+
+
+_tracer = Tracer()
+
+
+def span(name: str, **attributes: Any):
+    """
+    Time the enclosed block as a span nested under the current one.
+
+        with span('http.get', url=url) as s:
+            response = ...
+            s.set(status=response.status_code)
+
+    While tracing is disabled this returns a shared no-op object.
+    """
+    if not _tracer.enabled:
+        return _NOOP
+    return Span(name, attributes)
+
+
+def current_span():
+    """Return the active span, or a no-op span, e.g. to add attributes from a helper."""
+    active = _current_span.get() if _tracer.enabled else None
+    return active if active is not None else _NOOP
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator that wraps every call of the function in a span."""
+    def decorator(function: F) -> F:
+        span_name = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return function(*args, **kwargs)
+            with Span(span_name, {}):
+                return function(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def configure_tracing(enabled: bool = True, path: Optional[str] = None) -> Tracer:
+    """
+    Enable or disable tracing for the process.
+
+    With a path, the collected spans are exported there when the process exits.
+    """
+    _tracer.enabled = enabled
+    if enabled and path:
+        atexit.register(_export_at_exit, path)
+    return _tracer
+
+
+def _export_at_exit(path: str) -> None:
+    try:
+        count = _tracer.export(path)
+        print(f"Wrote {count} trace spans to {path}")
+    except OSError as e:
+        print(f"Error writing trace to {path}: {e}")
+
+
+# STOCK_AGENT_TRACE=trace.json (Chrome trace) or trace.jsonl (JSON lines) enables tracing
+if os.getenv('STOCK_AGENT_TRACE'):
+    configure_tracing(path=os.getenv('STOCK_AGENT_TRACE'))
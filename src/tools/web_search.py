@@ -10,6 +10,14 @@ def web_search(query):
         print(f"Error during web search: {e}")
         return []
 
+def web_news_search(query, max_results=10):
+    try:
+        # result in {date, title, body, url, image, source}
+        return DDGS().news(query, max_results=max_results)
+    except Exception as e:
+        print(f"Error during news search: {e}")
+        return []
+
 if __name__ == "__main__":
     # Perform a search
     result = web_search("what is duckduckgo")
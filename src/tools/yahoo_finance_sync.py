@@ -1,29 +1,26 @@
-import requests
 from bs4 import BeautifulSoup
-import json
-from datetime import datetime
-import os
+import asyncio
 import re
-from typing import List, Optional, Any
-from pydantic import BaseModel, HttpUrl, Field, field_validator, ConfigDict
+import threading
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from pydantic import BaseModel, Field, field_validator
+from .models import ArticleDetails
+from .concurrent_fetch import fetch_all, iter_fetch
+from .http_client import http_get
+from .article_cache import get_article_cache, normalize_url
+from .html_parser import ArticleSelectors, parse_article_html
+from .seen_index import SeenIndex
+from .article_store import get_article_store
+from .tracing import current_span, span
 
 
-class ArticleDetails(BaseModel):
-    """Model representing a news article's details."""
-    title: str = Field(..., description="Title of the article")
-    content: str = Field(..., description="Main content of the article")
-    url: str = Field(..., description="URL of the article")  # Changed from HttpUrl to str
-    timestamp: Optional[str] = Field(None, description="Publication timestamp of the article")
-    
-    @field_validator('content')
-    @classmethod
-    def clean_content(cls, v: str) -> str:
-        # Clean content if needed
-        return v
-    
-    model_config = ConfigDict(
-        arbitrary_types_allowed=True
-    )
+# Only the nodes read by parse_article are built in a partial parse
+YAHOO_ARTICLE_SELECTORS = ArticleSelectors(
+    title='[class*="cover-title yf-"]',
+    content='div.atoms-wrapper',
+    time='time.byline-attr-meta-time',
+    keep_classes=['cover-title', 'atoms-wrapper', 'byline-attr-meta-time'],
+)
 
 
 class ScraperConfig(BaseModel):
@@ -34,6 +31,14 @@ class ScraperConfig(BaseModel):
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         description="User agent string for HTTP requests"
     )
+    request_timeout: float = Field(10.0, description="Timeout in seconds for each HTTP request")
+    deadline: Optional[float] = Field(20.0, description="Overall time budget in seconds for fetching articles")
+    max_workers: int = Field(8, description="Number of articles fetched concurrently")
+    max_per_host: int = Field(4, description="Maximum concurrent requests to a single host")
+    use_cache: bool = Field(True, description="Serve and store parsed articles through the article cache")
+    parser_backend: Optional[str] = Field(
+        None, description="HTML parser backend ('selectolax', 'lxml' or 'html.parser'); defaults to the fastest installed"
+    )
     
     @field_validator('stock_symbol')
     @classmethod
@@ -43,6 +48,19 @@ class ScraperConfig(BaseModel):
         return v.strip().upper()
 
 
+class IncrementalResult(BaseModel):
+    """Result of an incremental scrape: newly seen articles plus the already-seen tail."""
+    new_articles: List[ArticleDetails] = Field(default_factory=list, description="Articles not seen in earlier runs")
+    cached_articles: List[ArticleDetails] = Field(
+        default_factory=list, description="Previously seen articles still in the listing, served from the cache"
+    )
+
+    @property
+    def articles(self) -> List[ArticleDetails]:
+        """New articles first, followed by the cached tail."""
+        return self.new_articles + self.cached_articles
+
+
 class YahooFinanceScraper:
     """Class for scraping news articles from Yahoo Finance."""
     
@@ -50,42 +68,69 @@ class YahooFinanceScraper:
         self.config = config
         self.headers = {"User-Agent": config.user_agent}
     
+    def parse_article(self, html: str, url: str) -> ArticleDetails:
+        """Parse the details of a single article page."""
+        page = parse_article_html(html, YAHOO_ARTICLE_SELECTORS, backend=self.config.parser_backend)
+
+        # Title extraction
+        title_text = page.title.strip() if page.title is not None else "No title found"
+        
+        # Content extraction
+        paragraphs = []
+        for text in page.paragraphs:
+            # Filter out empty paragraphs or paragraphs with specific content
+            text = text.strip()
+            if text and not text.startswith(('Read more:', 'Related:', 'Follow us on')):
+                # Clean text of special characters and extra spaces
+                text = re.sub(r'[\xa0\u200b]+', ' ', text)
+                text = re.sub(r'\s+', ' ', text)
+                paragraphs.append(text)
+        
+        content_text = '\n\n'.join(paragraphs)
+        
+        # Create and validate article model
+        return ArticleDetails(
+            title=title_text,
+            content=content_text,
+            url=url,
+            timestamp=page.timestamp
+        )
+
     def extract_article_details(self, url: str) -> Optional[ArticleDetails]:
-        """Extract details from a single article page."""
+        """Extract details from a single article page, using the article cache when enabled."""
+        with span('yahoo.article', url=url):
+            return self._extract_article_details(url)
+
+    def _extract_article_details(self, url: str) -> Optional[ArticleDetails]:
         try:
-            response = requests.get(url, headers=self.headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            cache = get_article_cache() if self.config.use_cache else None
+            cached = cache.get(url) if cache else None
+            if cached and cached.is_fresh:
+                current_span().set(cache='hit')
+                return ArticleDetails(**cached.payload)
 
-            # Title extraction
-            title_element = soup.find(class_=re.compile(r'cover-title yf-\w+'))
-            title_text = title_element.get_text().strip() if title_element else "No title found"
-            
-            # Content extraction
-            content_text = soup.find('div', class_='atoms-wrapper')
-            paragraphs = []
-            if content_text:
-                for p in content_text.find_all('p'):
-                    # Filter out empty paragraphs or paragraphs with specific content
-                    text = p.get_text().strip()
-                    if text and not text.startswith(('Read more:', 'Related:', 'Follow us on')):
-                        # Clean text of special characters and extra spaces
-                        text = re.sub(r'[\xa0\u200b]+', ' ', text)
-                        text = re.sub(r'\s+', ' ', text)
-                        paragraphs.append(text)
-            
-            content_text = '\n\n'.join(paragraphs)
+            # Revalidate stale entries so an unchanged article costs a 304 instead of a download
+            headers = dict(self.headers)
+            if cached and cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached and cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
 
-            # Time extraction
-            time_element = soup.find('time', class_='byline-attr-meta-time')
-            article_time = time_element['datetime'] if time_element and time_element.has_attr('datetime') else None
-            
-            # Create and validate article model
-            article = ArticleDetails(
-                title=title_text,
-                content=content_text,
-                url=url,
-                timestamp=article_time
-            )
+            response = http_get(url, headers=headers, timeout=self.config.request_timeout)
+            if cached and response.status_code == 304:
+                current_span().set(cache='revalidated')
+                cache.touch(url)
+                return ArticleDetails(**cached.payload)
+            current_span().set(cache='miss' if cache else 'disabled')
+
+            article = self.parse_article(response.text, url)
+            if cache and response.status_code == 200:
+                cache.put(
+                    url,
+                    article.model_dump(),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
             
             return article
             
@@ -93,85 +138,292 @@ class YahooFinanceScraper:
             print(f"Error extracting details from {url}: {e}")
             return None
 
+    @property
+    def listing_url(self) -> str:
+        """URL of the news listing page for the configured stock symbol."""
+        return f"https://finance.yahoo.com/quote/{self.config.stock_symbol}/news/"
+
+    def fetch_article_urls(self) -> List[str]:
+        """Fetch the listing page and return the unique article URLs in listing order."""
+        with span('yahoo.listing', ticker=self.config.stock_symbol) as s:
+            response = http_get(self.listing_url, headers=self.headers, timeout=self.config.request_timeout)
+            urls = self.parse_listing(response.text)
+            s.set(articles=len(urls))
+            return urls
+
+    def parse_listing(self, html: str) -> List[str]:
+        """Return the unique article URLs of a listing page in listing order."""
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # Extract article URLs with deduplication
+        links = soup.select('div[class*="holder yf-"] a[href^="https://finance.yahoo.com/"]')
+        seen_urls = set()
+        unique_article_urls = []
+        
+        for a in links:
+            url = a['href']
+            # Normalize URL by removing query parameters and fragments
+            clean_url = normalize_url(url)
+            if clean_url not in seen_urls:
+                seen_urls.add(clean_url)
+                unique_article_urls.append(url)
+        
+        return unique_article_urls
+
+    def fetch_articles(self, urls: List[str]) -> List[ArticleDetails]:
+        """Fetch articles concurrently; results keep the order of the given URLs."""
+        results = fetch_all(
+            urls,
+            self.extract_article_details,
+            max_workers=self.config.max_workers,
+            max_per_host=self.config.max_per_host,
+            deadline=self.config.deadline,
+        )
+        return [article for article in results if article]
+
     def scrape_news(self) -> List[ArticleDetails]:
         """Scrape news articles for the configured stock symbol."""
         print(f"Starting to scrape Yahoo Finance news for {self.config.stock_symbol}")
         
-        url = f"https://finance.yahoo.com/quote/{self.config.stock_symbol}/news/"
+        with span('yahoo.scrape_news', ticker=self.config.stock_symbol) as s:
+            try:
+                unique_article_urls = self.fetch_article_urls()
+                
+                max_articles = min(self.config.max_articles, len(unique_article_urls))
+                print(f"Found {len(unique_article_urls)} unique articles, processing first {max_articles}")
+                
+                articles = self.fetch_articles(unique_article_urls[:max_articles])
+                s.set(articles=len(articles))
+                return articles
+                
+            except Exception as e:
+                print(f"Error scraping news for {self.config.stock_symbol}: {e}")
+                return []
+    
+    def scrape_news_incremental(self) -> IncrementalResult:
+        """
+        Scrape only articles not seen in earlier runs for the configured stock symbol.
+
+        A persisted per-ticker index remembers which article URLs were already
+        scraped. Seen articles still in the top of the listing are served from
+        the article cache without any network request.
+        """
+        print(f"Starting incremental scrape of Yahoo Finance news for {self.config.stock_symbol}")
         
         try:
-            response = requests.get(url, headers=self.headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract article URLs with deduplication
-            links = soup.select('div[class*="holder yf-"] a[href^="https://finance.yahoo.com/"]')
-            seen_urls = set()
-            unique_article_urls = []
-            
-            for a in links:
-                url = a['href']
-                # Normalize URL by removing query parameters and fragments
-                clean_url = url.split('?')[0].split('#')[0]
-                if clean_url not in seen_urls:
-                    seen_urls.add(clean_url)
-                    unique_article_urls.append(url)
-            
-            articles = []
-            max_articles = min(self.config.max_articles, len(unique_article_urls))
-            print(f"Found {len(unique_article_urls)} unique articles, processing first {max_articles}")
-            
-            for article_url in unique_article_urls[:max_articles]:
-                article_details = self.extract_article_details(article_url)
-                if article_details:
-                    articles.append(article_details)
-            
-            return articles
-            
+            listing_urls = self.fetch_article_urls()[:self.config.max_articles]
         except Exception as e:
             print(f"Error scraping news for {self.config.stock_symbol}: {e}")
-            return []
-    
-    def save_articles_to_json(self, articles: List[ArticleDetails]) -> str:
-        """Save scraped articles to a JSON file."""
-        if not articles:
-            print("No articles to save")
-            return ""
-            
-        # Prepare directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        data_dir = os.path.join(os.path.dirname(current_dir), 'data')
-        os.makedirs(data_dir, exist_ok=True)
+            return IncrementalResult()
         
-        # Create filename
-        filename = f"{self.config.stock_symbol}_news_articles.json"
-        filepath = os.path.join(data_dir, filename)
+        index = SeenIndex(self.config.stock_symbol)
+        cache = get_article_cache()
+        cached: Dict[str, ArticleDetails] = {}
+        to_fetch = []
+        for url in listing_urls:
+            entry = cache.get(url) if url in index else None
+            if entry:
+                cached[url] = ArticleDetails(**entry.payload)
+            else:
+                to_fetch.append(url)
+        print(f"{len(to_fetch)} articles to fetch, {len(cached)} served from cache")
         
-        # Convert articles to dict and save using model_dump instead of dict
-        articles_dict = [article.model_dump() for article in articles]
+        fetched = dict(zip(to_fetch, fetch_all(
+            to_fetch,
+            self.extract_article_details,
+            max_workers=self.config.max_workers,
+            max_per_host=self.config.max_per_host,
+            deadline=self.config.deadline,
+        )))
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(articles_dict, f, ensure_ascii=False, indent=2)
+        result = IncrementalResult()
+        for url in listing_urls:
+            if url in cached:
+                result.cached_articles.append(cached[url])
+            elif article := fetched.get(url):
+                # Seen URLs that fell out of the cache were re-fetched but are not new
+                if url in index:
+                    result.cached_articles.append(article)
+                else:
+                    result.new_articles.append(article)
+                index.add(url, article.timestamp)
+        index.save()
         
-        print(f"Saved {len(articles)} articles to {filepath}")
-        return filepath
+        print(f"Found {len(result.new_articles)} new articles for {self.config.stock_symbol}")
+        return result
 
+    def iter_news(self) -> Iterator[ArticleDetails]:
+        """Yield articles for the configured stock symbol as soon as each one is parsed.
 
-def scrape_yahoo_finance_news(stock_symbol: str, max_articles: int = 10) -> List[ArticleDetails]:
-    """Main function to run the scraper."""
+        Articles are yielded in completion order rather than listing order.
+        """
+        print(f"Starting to stream Yahoo Finance news for {self.config.stock_symbol}")
+        
+        try:
+            unique_article_urls = self.fetch_article_urls()
+        except Exception as e:
+            print(f"Error scraping news for {self.config.stock_symbol}: {e}")
+            return
+        
+        max_articles = min(self.config.max_articles, len(unique_article_urls))
+        print(f"Found {len(unique_article_urls)} unique articles, processing first {max_articles}")
+        
+        for _, article in iter_fetch(
+            unique_article_urls[:max_articles],
+            self.extract_article_details,
+            max_workers=self.config.max_workers,
+            max_per_host=self.config.max_per_host,
+            deadline=self.config.deadline,
+        ):
+            if article:
+                yield article
+    
+    def save_articles(self, articles: List[ArticleDetails]) -> int:
+        """Save scraped articles to the local article store."""
+        if not articles:
+            print("No articles to save")
+            return 0
+        
+        saved = get_article_store().add_articles(articles, ticker=self.config.stock_symbol, source='yahoo')
+        print(f"Saved {saved} articles for {self.config.stock_symbol} to the article store")
+        return saved
+
+
+def scrape_yahoo_finance_news(stock_symbol: str, max_articles: int = 10, incremental: bool = False) -> List[ArticleDetails]:
+    """Main function to run the scraper.
+
+    With incremental=True only articles not seen in earlier runs are fetched;
+    they are returned first, followed by the previously seen articles from the cache.
+    """
     # Create config with validation
     config = ScraperConfig(stock_symbol=stock_symbol, max_articles=max_articles)
     
     # Initialize and run scraper
     scraper = YahooFinanceScraper(config)
-    articles = scraper.scrape_news()
+    if incremental:
+        articles = scraper.scrape_news_incremental().articles
+    else:
+        articles = scraper.scrape_news()
     
     # Save results
     if articles:
-        scraper.save_articles_to_json(articles)
+        scraper.save_articles(articles)
     
     return articles
 
 
+def iter_yahoo_finance_news(stock_symbol: str, max_articles: int = 10) -> Iterator[ArticleDetails]:
+    """Yield news articles one at a time as soon as each is parsed, then save them all."""
+    config = ScraperConfig(stock_symbol=stock_symbol, max_articles=max_articles)
+    scraper = YahooFinanceScraper(config)
+    
+    articles = []
+    for article in scraper.iter_news():
+        articles.append(article)
+        yield article
+    
+    # Save results once the stream is exhausted
+    if articles:
+        scraper.save_articles(articles)
+
+
+async def aiter_yahoo_finance_news(stock_symbol: str, max_articles: int = 10) -> AsyncIterator[ArticleDetails]:
+    """Async variant of iter_yahoo_finance_news; scraping runs in a worker thread."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+    # Set when the consumer stops early, e.g. on an error or when its event loop is torn down
+    stop = threading.Event()
+
+    def deliver(item) -> None:
+        if loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # The loop closed after the check above; nobody is waiting for the item
+            pass
+
+    def produce():
+        articles = iter_yahoo_finance_news(stock_symbol, max_articles)
+        try:
+            for article in articles:
+                if stop.is_set():
+                    break
+                deliver(article)
+        finally:
+            # Closing the generator cancels article fetches that have not started yet
+            articles.close()
+            deliver(finished)
+
+    # to_thread carries the caller's context (e.g. request priority) into the worker
+    producer = asyncio.ensure_future(asyncio.to_thread(produce))
+    try:
+        while (article := await queue.get()) is not finished:
+            yield article
+    finally:
+        stop.set()
+    await producer
+
+
+def scrape_yahoo_finance_news_batch(symbols: List[str], max_articles: int = 10) -> Dict[str, List[ArticleDetails]]:
+    """
+    Scrape news for several stock symbols at once.
+
+    Listing pages are fetched concurrently and articles shared between symbols
+    (e.g. syndicated stories) are downloaded and parsed only once.
+
+    Returns:
+        Dict mapping each normalized stock symbol to its articles in listing order.
+    """
+    scrapers: Dict[str, YahooFinanceScraper] = {}
+    for symbol in symbols:
+        config = ScraperConfig(stock_symbol=symbol, max_articles=max_articles)
+        scrapers.setdefault(config.stock_symbol, YahooFinanceScraper(config))
+    if not scrapers:
+        return {}
+
+    print(f"Starting to scrape Yahoo Finance news for {', '.join(scrapers)}")
+    by_listing_url = {scraper.listing_url: scraper for scraper in scrapers.values()}
+    any_scraper = next(iter(scrapers.values()))
+    listings = fetch_all(
+        list(by_listing_url),
+        lambda url: by_listing_url[url].fetch_article_urls(),
+        max_workers=any_scraper.config.max_workers,
+        max_per_host=any_scraper.config.max_per_host,
+        deadline=any_scraper.config.deadline,
+    )
+
+    # Merge article URLs across symbols so each unique article is fetched once
+    symbol_urls: Dict[str, List[str]] = {}
+    unique_urls: Dict[str, str] = {}
+    for symbol, urls in zip(scrapers, listings):
+        keys = []
+        for url in (urls or [])[:max_articles]:
+            key = normalize_url(url)
+            unique_urls.setdefault(key, url)
+            keys.append(key)
+        symbol_urls[symbol] = keys
+    print(f"Found {len(unique_urls)} unique articles across {len(scrapers)} symbols")
+
+    articles = fetch_all(
+        list(unique_urls.values()),
+        any_scraper.extract_article_details,
+        max_workers=any_scraper.config.max_workers,
+        max_per_host=any_scraper.config.max_per_host,
+        deadline=any_scraper.config.deadline,
+    )
+    fetched = dict(zip(unique_urls, articles))
+
+    results: Dict[str, List[ArticleDetails]] = {}
+    for symbol, keys in symbol_urls.items():
+        articles = [fetched[key] for key in keys if fetched.get(key)]
+        if articles:
+            scrapers[symbol].save_articles(articles)
+        results[symbol] = articles
+    return results
+
+
 if __name__ == "__main__":
     print("Running the script directly")
     stock = "NVDA"
@@ -1,8 +1,20 @@
 
+import io
 import sys
 import os
+import json
+import time
+import asyncio
+import inspect
 import unittest 
+from unittest import mock
+from types import SimpleNamespace
+
+import agent
 from agentDeprecated import ConversationalAssistant
+from src.tools.context_manager import ConversationContext
+from src.tools.models import ArticleDetails
+from src.tools.tool_cache import cache_key, configure_tool_cache
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
@@ -20,5 +32,119 @@ class TestConversationalAssistant(unittest.TestCase):
         self.assistant.clear_conversation()
         self.assertEqual(len(self.assistant.conversation_history), 0)
 
+
+class TestAgentToolCalls(unittest.TestCase):
+    def setUp(self):
+        configure_tool_cache()
+
+    @staticmethod
+    def tool_call(name, **arguments):
+        return SimpleNamespace(function=SimpleNamespace(name=name, arguments=arguments))
+
+    def test_tools_run_concurrently_in_call_order(self):
+        def slow(stock):
+            time.sleep(0.3)
+            return f"sync {stock}"
+
+        async def native(stock):
+            await asyncio.sleep(0.3)
+            return f"async {stock}"
+
+        def hang(stock):
+            time.sleep(2)
+
+        tools = {"slow": slow, "native": native, "hang": hang}
+        calls = [self.tool_call("slow", stock="NVDA"), self.tool_call("native", stock="AMD"),
+                 self.tool_call("slow", stock="INTC"), self.tool_call("hang", stock="X"), self.tool_call("missing")]
+        with mock.patch.dict(agent.available_functions, tools, clear=True), \
+                mock.patch.dict(agent.tool_timeouts, {"hang": 0.5}):
+            start = time.monotonic()
+            outputs = asyncio.run(agent.call_functions(calls))
+            elapsed = time.monotonic() - start
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(outputs[:3], ["sync NVDA", "async AMD", "sync INTC"])
+        self.assertIn("timed out", outputs[3])
+        self.assertIsNone(outputs[4])
+
+    def test_turn_makes_one_follow_up_per_tool_round(self):
+        def reply(content=None, tool_calls=None):
+            # A streamed response: content arrives in pieces, the last chunk carries the timings
+            pieces = [content[:2], content[2:]] if content else [""]
+            chunks = [SimpleNamespace(message=SimpleNamespace(content=piece, tool_calls=None), done=False)
+                      for piece in pieces]
+            chunks[-1].message.tool_calls = tool_calls
+            chunks[-1].done = True
+            chunks[-1].eval_count, chunks[-1].eval_duration = 10, 5e8
+            return chunks
+
+        class Client:
+            def __init__(self, responses):
+                self.responses = iter(responses)
+                self.calls = []
+
+            async def chat(self, model, messages, tools=None, options=None, stream=False, **kwargs):
+                self.calls.append(tools)
+                chunks = next(self.responses)
+
+                async def stream():
+                    for chunk in chunks:
+                        yield chunk
+                return stream()
+
+        round_one = reply(tool_calls=[self.tool_call("news", stock="NVDA"), self.tool_call("news", stock="AMD")])
+        client = Client([round_one, reply(tool_calls=[self.tool_call("news", stock="INTC")]), reply("done")])
+        context = ConversationContext("system")
+        context.append({"role": "user", "content": "news?"})
+        messages = context.messages
+        with mock.patch.dict(agent.available_functions, {"news": lambda stock: stock}, clear=True), \
+                mock.patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            answer = asyncio.run(agent.run_turn(client, "model", context))
+
+        self.assertEqual(answer, "done")
+        self.assertIn("Assistant: done\n[TTFT ", stdout.getvalue())
+        self.assertIn("20.0 tokens/s", stdout.getvalue())
+        self.assertEqual(len(client.calls), 3)
+        self.assertEqual(sum(1 for m in messages if m.get("tool_calls") == round_one[-1].message.tool_calls), 1)
+        self.assertEqual([m["content"] for m in messages if isinstance(m, dict) and m["role"] == "tool"],
+                         ["NVDA", "AMD", "INTC"])
+
+        # Once the step limit is reached the model is called without tools
+        looping = [reply(tool_calls=[self.tool_call("news", stock="NVDA")]) for _ in range(2)] + [reply("final")]
+        client = Client(looping)
+        with mock.patch.dict(agent.available_functions, {"news": lambda stock: stock}, clear=True):
+            answer = asyncio.run(agent.run_turn(client, "model", ConversationContext("system"), max_steps=2))
+        self.assertEqual(answer, "final")
+        self.assertIsNone(client.calls[-1])
+
+    def test_tool_schemas_match_available_functions(self):
+        schemas = {schema["function"]["name"]: schema["function"]["parameters"] for schema in agent.tool_schemas}
+        self.assertEqual(set(schemas), set(agent.available_functions))
+        for name, function in agent.available_functions.items():
+            self.assertEqual(schemas[name]["required"], list(inspect.signature(function).parameters), name)
+        json.dumps(agent.tool_schemas)
+
+    def test_shared_story_stays_under_every_ticker(self):
+        shared = ArticleDetails(title="Chip stocks rally", content="Nvidia and AMD shares rose on AI demand.", url="https://x.com/1")
+        amd_only = ArticleDetails(title="AMD earnings", content="AMD reported higher data center sales.", url="https://x.com/2")
+        batch = {"NVDA": [shared], "AMD": [shared, shared.model_copy(update={"url": "https://y.com/1"}), amd_only]}
+        with mock.patch.object(agent, "scrape_yahoo_finance_news_batch", return_value=batch):
+            results = agent.retrieve_stocks_news(["NVDA", "AMD"])
+
+        self.assertEqual(results["NVDA"], [shared])
+        self.assertEqual(results["AMD"], [shared, amd_only])
+
+    def test_several_symbols_in_one_string_are_split(self):
+        self.assertEqual(agent.split_symbols("NVDA, AMD"), ["NVDA", "AMD"])
+        self.assertEqual(agent.split_symbols(["NVDA AMD", "INTC"]), ["NVDA", "AMD", "INTC"])
+        with mock.patch.object(agent, "scrape_yahoo_finance_news_batch", return_value={"NVDA": [], "AMD": []}) as batch, \
+                mock.patch.object(agent, "iter_yahoo_finance_news") as single:
+            self.assertEqual(agent.retrieve_stock_news("NVDA, AMD"), {"NVDA": [], "AMD": []})
+        batch.assert_called_once_with(["NVDA", "AMD"])
+        single.assert_not_called()
+        self.assertEqual(cache_key("retrieve_stocks_news", {"stocks": ["nvda", "AMD "]}),
+                         cache_key("retrieve_stocks_news", {"stocks": ["NVDA", "AMD"]}))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
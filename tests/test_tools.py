@@ -1,9 +1,39 @@
-
 import sys
+import json
 import os
+import time
+import tempfile
+import threading
+import asyncio
 import unittest  
+from unittest import mock
+from types import SimpleNamespace
 
 from src.tools import scrape_yahoo_finance_news  
+from benchmarks.corpus import content_digest, pages
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.tools.concurrent_fetch import fetch_all
+from src.tools import http_client
+from src.tools.market_watch_sync import MarketWatchScraper, scrape_market_watch_news
+from src.tools.html_parser import available_backends
+from src.tools.rate_limiter import DomainLimit, Priority, RequestScheduler, SchedulerConfig, parse_retry_after
+from src.tools.article_store import ArticleStore
+from src.tools.models import ArticleBatch, ArticleRecord
+from src.tools.dedupe import SimHashIndex, collapse_near_duplicates, hamming_distance, simhash
+from src.tools.news_aggregator import NEWS_SOURCES, aggregate_stock_news
+from src.tools.prefetch import PrefetchConfig, PrefetchDaemon, WatchlistEntry, parse_watchlist, warm_articles
+from src.tools.context_manager import ContextConfig, ConversationContext
+from src.tools.render import ArticleRenderer, RenderConfig, lead, render_tool_output
+from src.tools.tool_cache import ToolCache, ToolCacheConfig, cache_key, stop_requested
+from src.tools.ticker_matcher import cancel_unused, find_tickers, speculate_tickers
+from src.tools.model_warmup import warm_up, warm_up_once
+from src.tools.summarize import DigestCache, MapReduceSummarizer, SummarizeConfig
+from src.tools.tracing import configure_tracing, current_span, get_tracer, span, traced
+from src.tools.article_cache import ArticleCache, configure_article_cache, get_article_cache, normalize_url
+from src.tools.yahoo_finance_sync import (
+    ArticleDetails, IncrementalResult, ScraperConfig, YahooFinanceScraper, aiter_yahoo_finance_news, iter_yahoo_finance_news,
+    scrape_yahoo_finance_news_batch,
+)
 
 
 class TestScraper(unittest.TestCase):
@@ -12,5 +42,1058 @@ class TestScraper(unittest.TestCase):
         self.assertIsInstance(articles, list)
         self.assertGreater(len(articles), 0)
 
+
+class TestConcurrentFetch(unittest.TestCase):
+    def test_results_keep_original_order(self):
+        delays = {"https://a.com/1": 0.05, "https://a.com/2": 0.0, "https://b.com/3": 0.02}
+
+        def fetch(url):
+            time.sleep(delays[url])
+            return url
+
+        urls = list(delays)
+        self.assertEqual(fetch_all(urls, fetch), urls)
+
+    def test_deadline_returns_partial_results(self):
+        def fetch(url):
+            if url.endswith("slow"):
+                time.sleep(1)
+            return url
+
+        urls = ["https://a.com/fast", "https://a.com/slow"]
+        start = time.monotonic()
+        results = fetch_all(urls, fetch, deadline=0.2)
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(results, ["https://a.com/fast", None])
+
+    def test_per_host_limit(self):
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def fetch(url):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            return url
+
+        urls = [f"https://a.com/{i}" for i in range(8)]
+        fetch_all(urls, fetch, max_workers=8, max_per_host=2)
+        self.assertLessEqual(active["peak"], 2)
+
+    def test_failed_fetch_is_none(self):
+        def fetch(url):
+            raise ValueError("boom")
+
+        self.assertEqual(fetch_all(["https://a.com/1"], fetch), [None])
+
+    def test_scrape_news_fetches_articles_concurrently(self):
+        listing = (
+            '<div class="holder yf-abc">'
+            '<a href="https://finance.yahoo.com/news/one.html">1</a>'
+            '<a href="https://finance.yahoo.com/news/two.html?x=1">2</a>'
+            '</div>'
+        )
+        scraper = YahooFinanceScraper(ScraperConfig(stock_symbol="nvda"))
+
+        def extract(url):
+            return ArticleDetails(title=url, content="", url=url)
+
+        with mock.patch("src.tools.yahoo_finance_sync.http_get") as get, \
+                mock.patch.object(scraper, "extract_article_details", side_effect=extract):
+            get.return_value.text = listing
+            articles = scraper.scrape_news()
+        self.assertEqual([a.url for a in articles], [
+            "https://finance.yahoo.com/news/one.html",
+            "https://finance.yahoo.com/news/two.html?x=1",
+        ])
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        http_client.configure_http_client(http_client.HttpClientConfig())
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        http_client.configure_http_client(http_client.HttpClientConfig())
+
+    def test_connections_are_reused(self):
+        url = f"http://127.0.0.1:{self.server.server_port}/"
+        for _ in range(3):
+            self.assertEqual(http_client.http_get(url).text, "ok")
+        stats = http_client.get_pool_stats()["127.0.0.1"]
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 2)
+
+    def test_session_negotiates_compression(self):
+        session = http_client.get_session()
+        self.assertIn("gzip", session.headers["Accept-Encoding"])
+        self.assertIs(session, http_client.get_session())
+
+    def test_scheduler_wait_is_bounded_by_timeout(self):
+        url = f"http://127.0.0.1:{self.server.server_port}/"
+        scheduler = RequestScheduler(SchedulerConfig(domain_limits={}))
+        scheduler.record_response(url, 429, "5")
+        with mock.patch.object(http_client, "get_scheduler", return_value=scheduler):
+            start = time.monotonic()
+            with self.assertRaises(http_client.requests.Timeout):
+                http_client.http_get(url, timeout=0.1)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(scheduler.metrics()[f"127.0.0.1:{self.server.server_port}"]["queue_depth"], 0)
+
+
+class TestMarketWatchScraper(unittest.TestCase):
+    def test_scrape_returns_articles_without_saving(self):
+        urls = ["https://www.marketwatch.com/story/a", "https://www.marketwatch.com/story/b"]
+
+        def extract(scraper, url):
+            return ArticleDetails(title=url, content="", url=url)
+
+        with mock.patch.object(MarketWatchScraper, "fetch_article_urls", return_value=urls), \
+                mock.patch.object(MarketWatchScraper, "extract_article_details", autospec=True, side_effect=extract), \
+                mock.patch.object(MarketWatchScraper, "save_articles") as save:
+            articles = scrape_market_watch_news("nvda", max_articles=1)
+        self.assertEqual([a.url for a in articles], urls[:1])
+        save.assert_not_called()
+
+
+class TestStreamingScrape(unittest.TestCase):
+    urls = ["https://finance.yahoo.com/news/slow.html", "https://finance.yahoo.com/news/fast.html"]
+
+    def extract(self, scraper, url):
+        if "slow" in url:
+            time.sleep(0.2)
+        return ArticleDetails(title=url, content="", url=url)
+
+    def patches(self):
+        return (
+            mock.patch.object(YahooFinanceScraper, "fetch_article_urls", return_value=self.urls),
+            mock.patch.object(YahooFinanceScraper, "extract_article_details", autospec=True, side_effect=self.extract),
+            mock.patch.object(YahooFinanceScraper, "save_articles"),
+        )
+
+    def test_iter_yields_in_completion_order(self):
+        urls, extract, save = self.patches()
+        with urls, extract, save as saved:
+            titles = [article.title for article in iter_yahoo_finance_news("NVDA")]
+        self.assertEqual(titles, list(reversed(self.urls)))
+        saved.assert_called_once()
+
+    def test_async_iter(self):
+        async def collect():
+            return [article.title async for article in aiter_yahoo_finance_news("NVDA")]
+
+        urls, extract, save = self.patches()
+        with urls, extract, save:
+            titles = asyncio.run(collect())
+        self.assertEqual(sorted(titles), sorted(self.urls))
+
+    def test_async_iter_stops_producer_when_consumer_stops(self):
+        produced = []
+        closed = threading.Event()
+
+        def slow_news(stock_symbol, max_articles):
+            try:
+                for n in range(20):
+                    time.sleep(0.02)
+                    produced.append(n)
+                    yield ArticleDetails(title=str(n), content="", url=f"https://finance.yahoo.com/news/{n}.html")
+            finally:
+                closed.set()
+
+        async def first_title():
+            async for article in aiter_yahoo_finance_news("NVDA"):
+                return article.title
+
+        with mock.patch("src.tools.yahoo_finance_sync.iter_yahoo_finance_news", side_effect=slow_news):
+            self.assertEqual(asyncio.run(first_title()), "0")
+            self.assertTrue(closed.wait(2))
+        self.assertLess(len(produced), 20)
+
+
+class TestBatchScrape(unittest.TestCase):
+    def test_shared_articles_fetched_once(self):
+        listings = {
+            "NVDA": ["https://finance.yahoo.com/news/chips.html", "https://finance.yahoo.com/news/nvda.html"],
+            "AMD": ["https://finance.yahoo.com/news/chips.html?src=amd", "https://finance.yahoo.com/news/amd.html"],
+        }
+        fetched = []
+
+        def fetch_urls(scraper):
+            return listings[scraper.config.stock_symbol]
+
+        def extract(scraper, url):
+            fetched.append(url)
+            return ArticleDetails(title=url, content="", url=url)
+
+        with mock.patch.object(YahooFinanceScraper, "fetch_article_urls", autospec=True, side_effect=fetch_urls), \
+                mock.patch.object(YahooFinanceScraper, "extract_article_details", autospec=True, side_effect=extract), \
+                mock.patch.object(YahooFinanceScraper, "save_articles"):
+            results = scrape_yahoo_finance_news_batch(["nvda", "AMD", "NVDA"], max_articles=2)
+
+        self.assertEqual(list(results), ["NVDA", "AMD"])
+        self.assertEqual(len(fetched), 3)
+        self.assertEqual(results["AMD"][0].url, "https://finance.yahoo.com/news/chips.html")
+        self.assertEqual(results["AMD"][1].url, "https://finance.yahoo.com/news/amd.html")
+
+
+YAHOO_ARTICLE_HTML = """
+<html><head><title>ignored</title></head><body>
+<nav><p>Menu</p></nav>
+<h1 class="cover-title yf-1o1tx8g">  Nvidia beats estimates  </h1>
+<time class="byline-attr-meta-time" datetime="2025-05-01T12:00:00.000Z">May 1</time>
+<div class="atoms-wrapper">
+  <p>First\xa0paragraph   with  <a href="#">a link</a>.</p>
+  <p>   </p>
+  <div><p>Read more: something else</p></div>
+  <p>Second paragraph.</p>
+</div>
+<footer><p>Footer</p></footer>
+</body></html>
+"""
+
+MARKET_WATCH_ARTICLE_HTML = """
+<html><body>
+<h1 class="article__headline css-14q97tr"> Chip stocks rally </h1>
+<time datetime="2025-05-02T09:30:00Z">May 2</time>
+<p>Lead paragraph.</p><p> </p><p>Body paragraph.</p>
+</body></html>
+"""
+
+
+class TestHtmlParser(unittest.TestCase):
+    def test_yahoo_backends_agree(self):
+        scraper = YahooFinanceScraper(ScraperConfig(stock_symbol="NVDA"))
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                scraper.config.parser_backend = backend
+                article = scraper.parse_article(YAHOO_ARTICLE_HTML, "https://finance.yahoo.com/news/a.html")
+                self.assertEqual(article.title, "Nvidia beats estimates")
+                self.assertEqual(article.content, "First paragraph with a link.\n\nSecond paragraph.")
+                self.assertEqual(article.timestamp, "2025-05-01T12:00:00.000Z")
+
+    def test_market_watch_backends_agree(self):
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                scraper = MarketWatchScraper(ScraperConfig(stock_symbol="NVDA", parser_backend=backend))
+                article = scraper.parse_article(MARKET_WATCH_ARTICLE_HTML, "https://www.marketwatch.com/story/a")
+                self.assertEqual(article.title, "Chip stocks rally")
+                self.assertEqual(article.content, "Lead paragraph.\n\nBody paragraph.")
+                self.assertEqual(article.timestamp, "2025-05-02T09:30:00Z")
+
+    def test_missing_nodes(self):
+        scraper = YahooFinanceScraper(ScraperConfig(stock_symbol="NVDA"))
+        article = scraper.parse_article("<html><body></body></html>", "https://finance.yahoo.com/news/a.html")
+        self.assertEqual(article.title, "No title found")
+        self.assertEqual(article.content, "")
+        self.assertIsNone(article.timestamp)
+
+
+class TestIncrementalScrape(unittest.TestCase):
+    def setUp(self):
+        configure_article_cache(":memory:")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = mock.patch("src.tools.seen_index.default_data_dir", return_value=self.tmp.name)
+        self.data_dir.start()
+
+    def tearDown(self):
+        self.data_dir.stop()
+        self.tmp.cleanup()
+
+    def run_scrape(self, listing):
+        fetched = []
+
+        def extract(scraper, url):
+            fetched.append(url)
+            article = ArticleDetails(title=url, content="", url=url, timestamp="2025-01-01T00:00:00Z")
+            get_article_cache().put(url, article.model_dump())
+            return article
+
+        scraper = YahooFinanceScraper(ScraperConfig(stock_symbol="NVDA"))
+        with mock.patch.object(YahooFinanceScraper, "fetch_article_urls", return_value=listing), \
+                mock.patch.object(YahooFinanceScraper, "extract_article_details", autospec=True, side_effect=extract):
+            return scraper.scrape_news_incremental(), fetched
+
+    def test_only_new_articles_are_fetched(self):
+        first = ["https://finance.yahoo.com/news/a.html", "https://finance.yahoo.com/news/b.html"]
+        result, fetched = self.run_scrape(first)
+        self.assertEqual(fetched, first)
+        self.assertEqual(len(result.new_articles), 2)
+
+        second = ["https://finance.yahoo.com/news/c.html"] + first
+        result, fetched = self.run_scrape(second)
+        self.assertEqual(fetched, ["https://finance.yahoo.com/news/c.html"])
+        self.assertEqual([a.url for a in result.new_articles], ["https://finance.yahoo.com/news/c.html"])
+        self.assertEqual([a.url for a in result.cached_articles], first)
+        self.assertEqual([a.url for a in result.articles], second)
+
+
+class TestArticleStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ArticleStore(os.path.join(self.tmp.name, "articles.sqlite3"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def article(self, name, day):
+        return ArticleDetails(
+            title=name, content=name, url=f"https://finance.yahoo.com/news/{name}.html",
+            timestamp=f"2025-01-{day:02d}T00:00:00Z",
+        )
+
+    def test_latest_and_range(self):
+        self.store.add_articles([self.article("a", 1), self.article("b", 3), self.article("c", 2)], ticker="nvda")
+        self.store.add_articles([self.article("b", 3)], ticker="AMD")
+        self.store.add_articles([self.article("d", 4)], ticker="AMD", source="marketwatch")
+        self.assertEqual([a.title for a in self.store.latest("NVDA", 2)], ["b", "c"])
+        self.assertEqual(self.store.count(), 4)
+        self.assertEqual(self.store.count("AMD"), 2)
+        self.assertEqual(
+            [a.title for a in self.store.query_range("NVDA", start="2025-01-01", end="2025-01-03")], ["c", "a"]
+        )
+        self.assertEqual([a.title for a in self.store.latest(source="marketwatch")], ["d"])
+        self.assertEqual(self.store.get("https://finance.yahoo.com/news/a.html?x=1").title, "a")
+
+    def test_concurrent_writers(self):
+        def write(worker):
+            self.store.add_articles([self.article(f"{worker}-{i}", 1) for i in range(20)], ticker="NVDA")
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.store.count("NVDA"), 80)
+
+
+class TestArticleRecords(unittest.TestCase):
+    articles = [
+        ArticleDetails(title="a", content="x", url="https://finance.yahoo.com/news/a.html", timestamp="2025-01-01"),
+        ArticleDetails(title="b", content="y", url="https://finance.yahoo.com/news/b.html"),
+    ]
+
+    def test_record_round_trip(self):
+        records = [ArticleRecord.from_model(article) for article in self.articles]
+        self.assertEqual([record.to_model() for record in records], self.articles)
+        self.assertEqual([record.to_dict() for record in records], [a.model_dump() for a in self.articles])
+
+    def test_batch_round_trip(self):
+        batch = ArticleBatch.from_models(self.articles)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.to_models(), self.articles)
+        self.assertEqual(batch.to_dicts(), [a.model_dump() for a in self.articles])
+        self.assertEqual(list(batch), [ArticleRecord.from_model(a) for a in self.articles])
+
+    def test_batch_columns_must_align(self):
+        with self.assertRaises(ValueError):
+            ArticleBatch(["a"], [], [], [])
+
+
+class TestFixtureCorpus(unittest.TestCase):
+    """Offline regression checks against the fixture pages in tests/fixtures."""
+
+    def test_yahoo_listing(self):
+        scraper = YahooFinanceScraper(ScraperConfig(stock_symbol="NVDA"))
+        for page in pages("yahoo", "listing"):
+            self.assertEqual(scraper.parse_listing(page["html"]), page["expected"]["article_urls"])
+
+    def test_market_watch_listing(self):
+        scraper = MarketWatchScraper(ScraperConfig(stock_symbol="NVDA"))
+        for page in pages("marketwatch", "listing"):
+            self.assertEqual(scraper.parse_listing(page["html"]), page["expected"]["article_urls"])
+
+    def test_articles_match_on_every_backend(self):
+        config = ScraperConfig(stock_symbol="NVDA")
+        scrapers = {"yahoo": YahooFinanceScraper(config), "marketwatch": MarketWatchScraper(config)}
+        for backend in available_backends():
+            config.parser_backend = backend
+            for page in pages(kind="article"):
+                with self.subTest(backend=backend, file=page["file"]):
+                    article = scrapers[page["source"]].parse_article(page["html"], page["url"])
+                    expected = page["expected"]
+                    self.assertEqual(article.title, expected["title"])
+                    self.assertEqual(article.timestamp, expected["timestamp"])
+                    self.assertEqual(content_digest(article.content), expected["content_sha256"])
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def scheduler(self, rate=50.0, burst=1):
+        return RequestScheduler(SchedulerConfig(default_limit=DomainLimit(rate=rate, burst=burst), domain_limits={}))
+
+    def test_token_bucket_limits_rate(self):
+        scheduler = self.scheduler(rate=50.0, burst=2)
+        start = time.monotonic()
+        for _ in range(6):
+            scheduler.acquire("https://a.com/x")
+        # Two burst tokens, then four more at 50/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.07)
+        self.assertEqual(scheduler.metrics()["a.com"]["requests"], 6)
+
+    def test_interactive_requests_go_first(self):
+        scheduler = self.scheduler(rate=20.0, burst=1)
+        scheduler.acquire("https://a.com/x")
+        order = []
+
+        def request(name, priority):
+            scheduler.acquire("https://a.com/x", priority)
+            order.append(name)
+
+        background = [threading.Thread(target=request, args=(f"bg{i}", Priority.BACKGROUND)) for i in range(2)]
+        for thread in background:
+            thread.start()
+        time.sleep(0.01)
+        interactive = threading.Thread(target=request, args=("interactive", Priority.INTERACTIVE))
+        interactive.start()
+        for thread in background + [interactive]:
+            thread.join()
+        self.assertEqual(order[0], "interactive")
+        self.assertEqual(scheduler.metrics()["a.com"]["max_queue_depth"], 3)
+
+    def test_429_honors_retry_after(self):
+        scheduler = self.scheduler(rate=100.0, burst=5)
+        scheduler.record_response("https://a.com/x", 429, "0.2")
+        waited = scheduler.acquire("https://a.com/x")
+        self.assertGreaterEqual(waited, 0.15)
+        metrics = scheduler.metrics()["a.com"]
+        self.assertEqual(metrics["throttled"], 1)
+        self.assertEqual(metrics["rate"], 50.0)
+        scheduler.record_response("https://a.com/x", 200)
+        self.assertEqual(scheduler.metrics()["a.com"]["rate"], 60.0)
+
+    def test_acquire_timeout(self):
+        scheduler = self.scheduler()
+        scheduler.record_response("https://a.com/x", 429, "5")
+        with self.assertRaises(TimeoutError):
+            scheduler.acquire("https://a.com/x", timeout=0.05)
+        self.assertEqual(scheduler.metrics()["a.com"]["queue_depth"], 0)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+
+class TestNearDuplicates(unittest.TestCase):
+    story = " ".join(
+        f"Shares of chipmaker number {i} rose after the company reported strong data center demand." for i in range(40)
+    )
+
+    def test_simhash_distance(self):
+        edited = "By Reuters staff. " + self.story + " Read the original story."
+        other = " ".join(f"The central bank held rates at meeting {i} citing inflation." for i in range(40))
+        self.assertLessEqual(hamming_distance(simhash(self.story), simhash(edited)), 6)
+        self.assertGreater(hamming_distance(simhash(self.story), simhash(other)), 6)
+
+    def test_collapse_across_sources(self):
+        yahoo = ArticleDetails(title="Chips rally", content=self.story, url="https://finance.yahoo.com/news/a.html")
+        yahoo_copy = ArticleDetails(
+            title="Chips rally", content=self.story + " Updated.", url="https://finance.yahoo.com/m/b.html"
+        )
+        same_url = ArticleDetails(title="x", content="y", url="https://finance.yahoo.com/news/a.html?src=rss")
+        market_watch = {"title": "Chips rally", "content": self.story.split(". "), "url": "https://www.marketwatch.com/story/c"}
+        other = ArticleDetails(title="Fed holds", content="Rates unchanged.", url="https://finance.yahoo.com/news/d.html")
+
+        index = SimHashIndex()
+        self.assertEqual(collapse_near_duplicates([yahoo, yahoo_copy, same_url, other], index), [yahoo, other])
+        self.assertEqual(collapse_near_duplicates([market_watch], index), [])
+
+
+class TestArticleCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = configure_article_cache(":memory:", ttl=60, max_entries=2)
+
+    def tearDown(self):
+        configure_article_cache(":memory:")
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url("HTTPS://Finance.Yahoo.com/news/a.html?.tsrc=fin#top"),
+            "https://finance.yahoo.com/news/a.html",
+        )
+
+    def test_lru_eviction(self):
+        self.cache.put("https://a.com/1", {"n": 1})
+        self.cache.put("https://a.com/2", {"n": 2})
+        self.cache.get("https://a.com/1")
+        self.cache.put("https://a.com/3", {"n": 3})
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get("https://a.com/2"))
+        self.assertEqual(self.cache.get("https://a.com/1?x=1").payload, {"n": 1})
+
+    def test_lookups_do_not_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ArticleCache(os.path.join(tmp, "cache.sqlite3"), access_flush_size=3)
+            self.assertEqual(cache._conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            for n in range(3):
+                cache.put(f"https://a.com/{n}", {"n": n})
+            writes = cache._conn.total_changes
+            cache.get("https://a.com/0")
+            cache.get("https://a.com/0")
+            cache.get("https://a.com/1")
+            self.assertEqual(cache._conn.total_changes, writes)
+            cache.get("https://a.com/2")
+            self.assertEqual(cache._conn.total_changes, writes + 3)
+            cache.close()
+
+    def test_fresh_entry_skips_download(self):
+        url = "https://finance.yahoo.com/news/a.html"
+        self.cache.put(url, {"title": "t", "content": "c", "url": url, "timestamp": None})
+        scraper = YahooFinanceScraper(ScraperConfig(stock_symbol="NVDA"))
+        with mock.patch("src.tools.yahoo_finance_sync.http_get") as get:
+            article = scraper.extract_article_details(url)
+        get.assert_not_called()
+        self.assertEqual(article.title, "t")
+
+    def test_stale_entry_is_revalidated(self):
+        url = "https://finance.yahoo.com/news/a.html"
+        self.cache.ttl = 0
+        self.cache.put(url, {"title": "t", "content": "c", "url": url, "timestamp": None}, etag='"v1"')
+        scraper = YahooFinanceScraper(ScraperConfig(stock_symbol="NVDA"))
+        with mock.patch("src.tools.yahoo_finance_sync.http_get") as get, \
+                mock.patch.object(scraper, "parse_article") as parse:
+            get.return_value.status_code = 304
+            article = scraper.extract_article_details(url)
+        self.assertEqual(get.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+        parse.assert_not_called()
+        self.assertEqual(article.content, "c")
+
+
+class TestNewsAggregator(unittest.TestCase):
+    def _sources(self, **sources):
+        return mock.patch.dict("src.tools.news_aggregator.NEWS_SOURCES", sources, clear=True)
+
+    def test_slow_source_is_marked_timed_out(self):
+        release = threading.Event()
+        fast = ArticleDetails(title="Fast", content="Fast story.", url="https://a.com/1", timestamp="2024-05-01T10:00:00Z")
+
+        def slow(symbol, max_articles, end):
+            release.wait(5)
+            return []
+
+        with self._sources(fast=lambda *args: [fast], slow=slow):
+            start = time.monotonic()
+            news = aggregate_stock_news("nvda", budget=0.3)
+            elapsed = time.monotonic() - start
+        release.set()
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(news.timed_out, ["slow"])
+        self.assertEqual(news.sources["fast"].status, "ok")
+        self.assertEqual([(a.title, a.source) for a in news.articles], [("Fast", "fast")])
+
+    def test_slow_listing_still_returns_finished_articles(self):
+        urls = [f"https://finance.yahoo.com/news/{n}.html" for n in range(10)]
+
+        def listing(scraper):
+            time.sleep(0.3)
+            return urls
+
+        def extract(scraper, url):
+            time.sleep(0.25)
+            return ArticleDetails(title=url, content=f"Story {url}.", url=url)
+
+        with self._sources(yahoo=NEWS_SOURCES["yahoo"]), \
+                mock.patch.object(YahooFinanceScraper, "fetch_article_urls", autospec=True, side_effect=listing), \
+                mock.patch.object(YahooFinanceScraper, "extract_article_details", autospec=True, side_effect=extract):
+            start = time.monotonic()
+            news = aggregate_stock_news("NVDA", budget=1.0)
+            elapsed = time.monotonic() - start
+
+        # Listing 0.3s, then two rounds of four articles fit before the budget ends
+        self.assertLess(elapsed, 1.1)
+        self.assertEqual(news.sources["yahoo"].status, "ok")
+        self.assertEqual(news.sources["yahoo"].articles, 8)
+
+    def test_merge_ranks_by_recency_and_collapses_duplicates(self):
+        story = TestNearDuplicates.story
+        yahoo = [
+            ArticleDetails(title="Old", content="Fed holds rates.", url="https://a.com/old", timestamp="2024-05-01T08:00:00Z"),
+            ArticleDetails(title="Chips", content=story, url="https://a.com/chips", timestamp="2024-05-02T08:00:00Z"),
+        ]
+        web = [
+            ArticleDetails(title="Chips", content=story + " Updated.", url="https://b.com/chips", timestamp="2024-05-01T09:00:00+00:00"),
+            ArticleDetails(title="Undated", content="No date here.", url="https://b.com/undated"),
+        ]
+
+        def broken(*args):
+            raise RuntimeError("boom")
+
+        with self._sources(yahoo=lambda *args: yahoo, web=lambda *args: web, broken=broken):
+            news = aggregate_stock_news("NVDA", budget=2)
+
+        self.assertEqual([a.title for a in news.articles], ["Chips", "Old", "Undated"])
+        self.assertEqual(news.articles[0].source, "yahoo")
+        self.assertEqual(news.sources["broken"].status, "error")
+        self.assertEqual(news.timed_out, [])
+
+
+class TestPrefetchDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ArticleStore(os.path.join(self.tmp.name, "articles.sqlite3"))
+        self.patches = [
+            mock.patch("src.tools.article_store._store", self.store),
+            mock.patch.object(YahooFinanceScraper, "scrape_news_incremental", autospec=True, side_effect=self.scrape),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tmp.cleanup()
+
+    @staticmethod
+    def scrape(scraper):
+        symbol = scraper.config.stock_symbol
+        return IncrementalResult(new_articles=[ArticleDetails(
+            title=symbol, content="", url=f"https://finance.yahoo.com/news/{symbol}.html", timestamp="2025-01-01T00:00:00Z",
+        )])
+
+    def test_refresh_makes_ticker_warm(self):
+        self.assertIsNone(warm_articles("NVDA"))
+        PrefetchDaemon(PrefetchConfig()).refresh("nvda")
+        self.assertEqual([a.title for a in warm_articles("nvda")], ["NVDA"])
+
+        self.store.mark_refreshed("NVDA", at=time.time() - 3600)
+        self.assertIsNone(warm_articles("NVDA", max_age=60))
+
+    def test_run_refreshes_watchlist_periodically(self):
+        config = PrefetchConfig(watchlist=parse_watchlist("nvda:0.05, amd"), default_interval=60, jitter=0.1)
+        daemon = PrefetchDaemon(config).start()
+        deadline = time.monotonic() + 5
+        while daemon.refresh_counts.get("NVDA", 0) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        daemon.stop(timeout=5)
+
+        self.assertGreaterEqual(daemon.refresh_counts["NVDA"], 3)
+        # The first AMD refresh is staggered within 10% of its 60s interval
+        self.assertLessEqual(daemon.refresh_counts.get("AMD", 0), 1)
+        self.assertEqual(config.watchlist[1], WatchlistEntry(stock_symbol="AMD"))
+
+
+class TestConversationContext(unittest.TestCase):
+    def make_context(self, **config):
+        return ConversationContext("system prompt", ContextConfig(**config), tokenizer=len)
+
+    def add_turn(self, context, n, tool_output="x" * 200):
+        context.append({"role": "user", "content": f"question {n}"})
+        context.append({"role": "assistant", "content": "", "tool_calls": [f"call {n}"]})
+        context.append({"role": "tool", "content": tool_output, "name": "news"})
+        context.append({"role": "assistant", "content": f"answer {n}"})
+
+    def test_old_tool_outputs_are_summarized_first(self):
+        context = self.make_context(max_prompt_tokens=700, keep_recent_turns=1, tool_summary_chars=10)
+        for n in range(3):
+            self.add_turn(context, n)
+        messages = context.prompt_messages()
+
+        self.assertEqual(messages[0]["content"], "system prompt")
+        self.assertEqual(len(messages), 13)
+        tool_contents = [m["content"] for m in messages if m["role"] == "tool"]
+        self.assertTrue(tool_contents[0].startswith("[Earlier tool output truncated"))
+        self.assertEqual(tool_contents[-1], "x" * 200)
+        self.assertNotIn("evicted", messages[3])
+        self.assertLessEqual(context.metrics[-1].estimated_prompt_tokens, 700)
+        self.assertGreater(context.metrics[-1].evicted_tokens, 0)
+
+    def test_prompt_stays_flat_over_long_sessions(self):
+        context = self.make_context(max_prompt_tokens=600, keep_recent_turns=2)
+        for n in range(50):
+            self.add_turn(context, n)
+            context.prompt_messages()
+            context.record_response(SimpleNamespace(prompt_eval_count=123, prompt_eval_duration=2e9))
+
+        self.assertLessEqual(max(m.estimated_prompt_tokens for m in context.metrics), 600)
+        self.assertEqual([m["content"] for m in context.messages if m["role"] == "user"], ["question 48", "question 49"])
+        self.assertEqual(context.messages[1]["role"], "user")
+        self.assertEqual((context.metrics[-1].prompt_eval_count, context.metrics[-1].prompt_eval_seconds), (123, 2.0))
+
+
+class TestRenderer(unittest.TestCase):
+    def articles(self, n, sentences=30):
+        body = " ".join(f"Sentence {i} about chip demand." for i in range(sentences))
+        return [
+            ArticleDetails(title=f"Story {i}", content=body, url=f"https://finance.yahoo.com/news/{i}.html",
+                           timestamp="2025-01-01T00:00:00Z")
+            for i in range(n)
+        ]
+
+    def test_lead_sentences(self):
+        self.assertEqual(lead("One. Two! Three? Four.", 2), "One. Two!")
+        self.assertEqual(lead("No end", 3), "No end")
+
+    def test_text_layout_keeps_summary_fields(self):
+        text = render_tool_output(self.articles(2))
+        self.assertIn("[1] Story 0\n2025-01-01T00:00:00Z\nhttps://finance.yahoo.com/news/0.html\n"
+                      "Sentence 0 about chip demand. Sentence 1", text)
+        self.assertNotIn("Sentence 4 ", text)
+        self.assertLess(len(text), len(str(self.articles(2))) / 5)
+
+    def test_budget_shrinks_content_then_drops_articles(self):
+        renderer = ArticleRenderer(RenderConfig(max_tokens=300, lead_sentences=None, max_article_chars=None))
+        text = renderer.render(self.articles(5))
+        self.assertLessEqual(renderer.tokenizer(text), 300)
+        self.assertIn("[5] Story 4", text)
+
+        text = renderer.render(self.articles(40))
+        self.assertLessEqual(renderer.tokenizer(text), 300)
+        self.assertRegex(text, r"\((\d+) more articles omitted\)$")
+
+    def test_json_and_other_outputs(self):
+        renderer = ArticleRenderer(RenderConfig(format="json"))
+        rendered = json.loads(renderer.render([{"title": "t", "url": "https://a.com", "content": ["a.", "b."],
+                                                "source": "marketwatch"}]))
+        self.assertEqual(rendered, [{"title": "t", "source": "marketwatch", "url": "https://a.com", "content": "a. b."}])
+
+        grouped = render_tool_output({"NVDA": self.articles(1), "AMD": []})
+        self.assertIn("## NVDA\n[1] Story 0", grouped)
+        self.assertIn("## AMD\nNo articles found", grouped)
+        aggregated = render_tool_output({"articles": self.articles(1), "timed_out_sources": ["marketwatch"]})
+        self.assertTrue(aggregated.endswith("timed_out_sources: ['marketwatch']"))
+        self.assertEqual(render_tool_output("Error retrieving news"), "Error retrieving news")
+
+
+class TestToolCache(unittest.TestCase):
+    def test_ttl_lru_and_normalized_keys(self):
+        cache = ToolCache(ToolCacheConfig(max_entries=2, default_ttl=60, ttls={"live": 0}))
+        calls = []
+
+        def tool(stock):
+            calls.append(stock)
+            return [stock]
+
+        self.assertEqual(cache_key("news", {"stock": " nvda"}), cache_key("news", {"stock": "NVDA"}))
+        cache.call("news", {"stock": "nvda"}, tool)
+        cache.call("news", {"stock": "NVDA "}, tool)
+        self.assertEqual(calls, ["nvda"])
+
+        cache.call("news", {"stock": "AMD"}, tool)
+        cache.call("news", {"stock": "NVDA"}, tool)
+        cache.call("news", {"stock": "INTC"}, tool)
+        cache.call("news", {"stock": "AMD"}, tool)
+        self.assertEqual(calls, ["nvda", "AMD", "INTC", "AMD"])
+        self.assertEqual(len(cache), 2)
+
+        cache.call("live", {"stock": "NVDA"}, tool)
+        cache.call("live", {"stock": "NVDA"}, tool)
+        self.assertEqual(calls[-2:], ["NVDA", "NVDA"])
+        self.assertEqual(cache.call("news", {"stock": "X"}, lambda stock: "Error: down"), "Error: down")
+        self.assertEqual(len(cache), 2)
+
+    def test_empty_results_are_not_cached(self):
+        cache = ToolCache()
+        results = iter([[], ["NVDA story"]])
+        calls = []
+
+        def tool(stock):
+            calls.append(stock)
+            return next(results)
+
+        self.assertEqual(cache.call("news", {"stock": "NVDA"}, tool), [])
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.call("news", {"stock": "NVDA"}, tool), ["NVDA story"])
+        self.assertEqual(calls, ["NVDA", "NVDA"])
+        self.assertEqual(len(cache), 1)
+
+    def test_concurrent_identical_calls_share_one_execution(self):
+        cache = ToolCache()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def tool(stock):
+            calls.append(stock)
+            started.set()
+            release.wait(5)
+            return [stock]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.call("news", {"stock": "NVDA"}, tool)))
+                   for _ in range(5)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(calls, ["NVDA"])
+        self.assertEqual(results, [["NVDA"]] * 5)
+        self.assertEqual((cache.misses, cache.coalesced), (1, 4))
+
+    def test_async_waiters_in_other_threads_and_errors(self):
+        cache = ToolCache()
+        calls = []
+
+        async def tool(stock):
+            calls.append(stock)
+            await asyncio.sleep(0.2)
+            raise RuntimeError("down")
+
+        errors = []
+
+        def session():
+            try:
+                asyncio.run(cache.acall("news", {"stock": "NVDA"}, tool))
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=session) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(calls, ["NVDA"])
+        self.assertEqual(errors, ["down"] * 3)
+        self.assertEqual(len(cache), 0)
+
+
+class TestSpeculativePrefetch(unittest.TestCase):
+    def test_find_tickers(self):
+        self.assertEqual(find_tickers("How is Nvidia doing vs $amd and INTC?"), ["NVDA", "AMD", "INTC"])
+        self.assertEqual(find_tickers("Is IT spending up? Compare Bank of America and V"), ["BAC"])
+        self.assertEqual(find_tickers("tell me a joke"), [])
+        self.assertEqual(find_tickers("TSLA, tesla and AAPL", limit=2), ["TSLA", "AAPL"])
+
+    def test_model_call_joins_speculative_run(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache = ToolCache()
+        calls = []
+
+        def news(stock):
+            calls.append(stock)
+            time.sleep(0.2)
+            return [stock]
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            speculations = speculate_tickers("news on nvidia and AMD?", "news", news, executor, cache=cache)
+            self.assertEqual(len(speculations), 2)
+            # The model asks for NVDA only: the queued AMD run is cancelled
+            model_calls = [SimpleNamespace(function=SimpleNamespace(name="news", arguments={"stock": "nvda"}))]
+            self.assertEqual(cancel_unused(speculations, model_calls), 1)
+            self.assertEqual(cache.call("news", {"stock": "nvda"}, news), ["NVDA"])
+
+        self.assertEqual(calls, ["NVDA"])
+        self.assertEqual(cache.coalesced + cache.hits, 1)
+        self.assertEqual(speculate_tickers("NVDA again", "news", news, executor, cache=cache), {})
+
+    def test_running_speculation_stops_and_releases_its_slot(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        cache = ToolCache()
+        started = threading.Event()
+        fetched = []
+
+        def news(stock):
+            started.set()
+            for n in range(50):
+                if stop_requested():
+                    break
+                fetched.append(n)
+                time.sleep(0.01)
+            return [f"{stock} {n}" for n in fetched]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            speculations = speculate_tickers("Apple and Microsoft?", "news", news, executor, cache=cache)
+            self.assertTrue(started.wait(2))
+            self.assertEqual(cancel_unused(speculations, []), 2)
+            self.assertTrue(all(s.cancelled() for s in speculations.values()))
+            for speculation in speculations.values():
+                speculation.result(2)
+
+        self.assertLess(len(fetched), 50)
+        # Partial results are never cached and a later call runs the tool afresh
+        self.assertEqual(len(cache), 0)
+        self.assertFalse(stop_requested())
+        self.assertEqual(len(cache.call("news", {"stock": "AAPL"}, lambda stock: ["fresh"])), 1)
+
+
+class TestModelWarmup(unittest.TestCase):
+    def test_warm_up_reports_load_and_prefill_separately(self):
+        client = mock.Mock()
+        client.chat.return_value = SimpleNamespace(load_duration=3e9, prompt_eval_duration=5e8, prompt_eval_count=400)
+        system = [{"role": "system", "content": "prompt"}]
+        report = warm_up(client, "qwen3", system, tools=["schema"], options={"num_ctx": 4096}, keep_alive="1h")
+
+        self.assertEqual((report.load_seconds, report.prompt_eval_seconds, report.prompt_eval_count), (3.0, 0.5, 400))
+        self.assertIn("load 3.00s, prefill 0.50s (400 tokens)", str(report))
+        kwargs = client.chat.call_args.kwargs
+        self.assertEqual(kwargs["options"], {"num_ctx": 4096, "num_predict": 1})
+        self.assertEqual((kwargs["tools"], kwargs["keep_alive"], kwargs["messages"]), (["schema"], "1h", system))
+
+    def test_warm_up_once_per_model(self):
+        client = mock.Mock()
+        client.chat.return_value = SimpleNamespace(load_duration=0, prompt_eval_duration=0, prompt_eval_count=0)
+        with mock.patch.dict("src.tools.model_warmup._warm_models", clear=True):
+            first = warm_up_once(client, "warm-test", [])
+            self.assertIs(warm_up_once(client, "warm-test", []), first)
+        self.assertEqual(client.chat.call_count, 1)
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        configure_tracing()
+        get_tracer().clear()
+
+    def tearDown(self):
+        configure_tracing(enabled=False)
+        get_tracer().clear()
+
+    def test_spans_nest_across_fetch_threads(self):
+        @traced("fetch")
+        def fetch(url):
+            with span("parse", url=url):
+                current_span().set(bytes=len(url))
+            return url
+
+        with span("turn") as turn:
+            fetch_all(["https://a.com/1", "https://b.com/2"], fetch)
+
+        spans = get_tracer().spans()
+        fetches = [s for s in spans if s.name == "fetch"]
+        parses = [s for s in spans if s.name == "parse"]
+        self.assertEqual(len(fetches), 2)
+        self.assertTrue(all(s.parent_id == turn.span_id for s in fetches))
+        self.assertEqual({s.parent_id for s in parses}, {s.span_id for s in fetches})
+        self.assertNotIn(turn.thread_id, {s.thread_id for s in fetches})
+        self.assertEqual(sorted(s.attributes["bytes"] for s in parses), [15, 15])
+
+    def test_disabled_tracing_records_nothing(self):
+        configure_tracing(enabled=False)
+        with span("turn") as s:
+            s.set(ignored=True)
+            current_span().set(ignored=True)
+        self.assertEqual(get_tracer().spans(), [])
+
+    def test_errors_are_recorded(self):
+        with self.assertRaises(ValueError):
+            with span("tool"):
+                raise ValueError("boom")
+        self.assertIn("boom", get_tracer().spans()[0].attributes["error"])
+
+    def test_export_jsonl_and_chrome_trace(self):
+        with span("turn", model="qwen3"):
+            with span("tool", tool="stock_news"):
+                pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl_path = os.path.join(tmp, "trace.jsonl")
+            chrome_path = os.path.join(tmp, "trace.json")
+            self.assertEqual(get_tracer().export(jsonl_path), 2)
+            self.assertEqual(get_tracer().export(chrome_path), 2)
+
+            with open(jsonl_path) as f:
+                records = [json.loads(line) for line in f]
+            with open(chrome_path) as f:
+                events = json.load(f)["traceEvents"]
+
+        tool, turn = records
+        self.assertEqual((tool["name"], tool["parent_id"]), ("tool", turn["span_id"]))
+        self.assertEqual(turn["attributes"], {"model": "qwen3"})
+        self.assertEqual([e["ph"] for e in events], ["X", "X"])
+        self.assertEqual(events[0]["args"]["tool"], "stock_news")
+        self.assertGreaterEqual(events[1]["dur"], events[0]["dur"])
+
+
+class _SummaryClient:
+    """Fake Ollama client that digests articles by echoing their titles."""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def chat(self, model, messages, **kwargs):
+        prompt = messages[-1]["content"] if model == "map" else messages[1]["content"]
+        with self._lock:
+            self.calls.append((model, prompt))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if model == "reduce":
+                return SimpleNamespace(message=SimpleNamespace(content="summary:\n" + prompt))
+            title = prompt.split("Title: ", 1)[1].split("\n", 1)[0]
+            if title == self.fail_on:
+                raise RuntimeError("model unavailable")
+            return SimpleNamespace(message=SimpleNamespace(content=f"digest of {title}"))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class TestMapReduceSummarizer(unittest.TestCase):
+    def setUp(self):
+        self.config = SummarizeConfig(map_model="map", reduce_model="reduce", max_concurrency=2)
+        self.articles = [
+            ArticleDetails(title=f"Story {i}", content=f"Body {i}. More detail.", url=f"https://x.com/{i}")
+            for i in range(5)
+        ]
+
+    def test_map_is_bounded_and_reduce_keeps_order(self):
+        client = _SummaryClient(delay=0.05)
+        summary = MapReduceSummarizer(self.config, client, DigestCache()).summarize("NVDA", self.articles)
+
+        self.assertEqual(client.peak, 2)
+        self.assertEqual([model for model, _ in client.calls].count("map"), 5)
+        self.assertEqual(client.calls[-1][0], "reduce")
+        positions = [summary.index(f"digest of Story {i}") for i in range(5)]
+        self.assertEqual(positions, sorted(positions))
+        self.assertIn("how many articles you summarized (5)", summary)
+
+    def test_digests_are_cached_by_content(self):
+        client = _SummaryClient()
+        cache = DigestCache()
+        summarizer = MapReduceSummarizer(self.config, client, cache)
+        summarizer.summarize("NVDA", self.articles[:3])
+        changed = self.articles[2].model_copy(update={"content": "Updated body."})
+        summarizer.summarize("NVDA", self.articles[:2] + [changed, self.articles[3]])
+
+        mapped = [prompt for model, prompt in client.calls if model == "map"]
+        self.assertEqual(len(mapped), 5)
+        self.assertIn("Updated body.", mapped[3])
+        self.assertEqual(len(cache), 5)
+
+    def test_failed_map_falls_back_to_lead(self):
+        client = _SummaryClient(fail_on="Story 1")
+        digests = MapReduceSummarizer(self.config, client, DigestCache()).map("NVDA", self.articles[:2])
+        self.assertEqual(digests, ["digest of Story 0", "Body 1. More detail."])
+
+    def test_no_articles_skips_the_model(self):
+        client = _SummaryClient()
+        summary = MapReduceSummarizer(self.config, client, DigestCache()).summarize("NVDA", [])
+        self.assertIn("No recent news", summary)
+        self.assertEqual(client.calls, [])
+
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
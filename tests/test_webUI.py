@@ -0,0 +1,64 @@
+import os
+import sys
+import asyncio
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import streamlit_local
+from tools.models import ArticleDetails
+from tools.tool_cache import configure_tool_cache
+
+
+class TestStockNewsTool(unittest.TestCase):
+    def setUp(self):
+        self.articles = [
+            ArticleDetails(title="Nvidia beats estimates", content="Nvidia reported record data center revenue this quarter.", url="https://x.com/1"),
+            ArticleDetails(title="Nvidia beats estimates", content="Nvidia reported record data center revenue this quarter.", url="https://y.com/1"),
+            ArticleDetails(title="Nvidia unveils new chip", content="The new accelerator ships next year to cloud providers.", url="https://x.com/2"),
+        ]
+        patches = [
+            mock.patch.object(streamlit_local, "warm_articles", return_value=None),
+            mock.patch.object(streamlit_local, "iter_yahoo_finance_news", side_effect=lambda stock: (article for article in self.articles)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(configure_tool_cache)
+
+    def call_tool(self, placeholder):
+        tool_call = SimpleNamespace(function=SimpleNamespace(name="stock_news", arguments={"stock": "NVDA"}))
+        assistant = streamlit_local.StockChatAssistant()
+        return asyncio.run(assistant.call_function(tool_call, placeholder))
+
+    def test_speculative_and_tool_paths_return_the_same_output(self):
+        cache = configure_tool_cache()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            speculative = cache.speculate("stock_news", {"stock": "NVDA"}, streamlit_local.stock_news, executor).result()
+
+        configure_tool_cache()
+        placeholder = mock.Mock()
+        tool_output = self.call_tool(placeholder)
+
+        self.assertEqual(tool_output, speculative)
+        self.assertEqual([article.url for article in tool_output], ["https://x.com/1", "https://x.com/2"])
+        self.assertIn("_Retrieved 2 articles: Nvidia unveils new chip_", [c.args[0] for c in placeholder.markdown.call_args_list])
+
+    def test_prefetched_articles_are_served_on_both_paths(self):
+        cache = configure_tool_cache()
+        with mock.patch.object(streamlit_local, "warm_articles", return_value=self.articles):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                speculative = cache.speculate("stock_news", {"stock": "NVDA"}, streamlit_local.stock_news, executor).result()
+            configure_tool_cache()
+            tool_output = self.call_tool(mock.Mock())
+
+        self.assertEqual(tool_output, speculative)
+        self.assertEqual(len(tool_output), 2)
+        streamlit_local.iter_yahoo_finance_news.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()